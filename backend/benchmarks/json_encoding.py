@@ -0,0 +1,90 @@
+"""Per-request serialization cost of the GET /api/blog payload.
+
+Compares the APIResponse model + jsonable_encoder path against the fast
+``dump_json`` path (orjson when installed, else the stdlib encoder) on a
+page of posts shaped like the ones the route returns. No database needed:
+
+    python benchmarks/json_encoding.py --posts 50 --content-size 4000
+"""
+import argparse
+import json
+import sys
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models import APIResponse  # noqa: E402
+from responses import dump_json, orjson, render_json  # noqa: E402
+
+
+def sample_page(posts: int, content_size: int, view: str) -> dict:
+    """A get_blog_posts data payload with realistic field types"""
+    created = datetime(2025, 1, 15, 9, 30)
+    page = []
+    for i in range(posts):
+        post = {
+            "id": f"post-{i}",
+            "title": f"Productivity Tips for Virtual Assistants, Part {i}",
+            "slug": f"productivity-tips-for-virtual-assistants-part-{i}",
+            "excerpt": "Essential productivity strategies that help virtual assistants deliver exceptional results.",
+            "author": "Nelbert Tomicos",
+            "category": "Productivity",
+            "tags": ["Productivity", "Virtual Assistant", "Tips"],
+            "image": "https://images.unsplash.com/photo-1?auto=format&fit=crop&w=1200&q=80",
+            "readTime": "5 min read",
+            "published": True,
+            "views": 1000 + i,
+            "wordCount": content_size // 6,
+            "contentHash": "0" * 64,
+            "createdAt": created - timedelta(days=i),
+            "updatedAt": created - timedelta(days=i, hours=-2, microseconds=-1234),
+            "date": (created - timedelta(days=i)).strftime('%Y-%m-%d'),
+        }
+        if view == "full":
+            post["content"] = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * (content_size // 57 + 1))[:content_size]
+        page.append(post)
+    return {"posts": page, "total": len(page), "nextCursor": "eyJjIjoiMjAyNS0wMS0wMVQwMDowMDowMCIsImkiOiJwb3N0In0"}
+
+
+def model_path(data: dict) -> bytes:
+    return render_json(APIResponse(success=True, message="Blog posts retrieved successfully", data=data))
+
+
+def fast_path(data: dict) -> bytes:
+    return dump_json({"success": True, "message": "Blog posts retrieved successfully", "data": data})
+
+
+def measure(func, data: dict, number: int, repeat: int) -> float:
+    """Best-of-repeat mean seconds per call"""
+    return min(timeit.repeat(lambda: func(data), number=number, repeat=repeat)) / number
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=50)
+    parser.add_argument("--content-size", type=int, default=4000, help="characters of content per post")
+    parser.add_argument("--view", choices=["full", "list"], default="full")
+    parser.add_argument("--number", type=int, default=200, help="calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    data = sample_page(args.posts, args.content_size, args.view)
+    if json.loads(model_path(data)) != json.loads(fast_path(data)):
+        print("fast path output differs from the model path")
+        return 1
+
+    model = measure(model_path, data, args.number, args.repeat)
+    fast = measure(fast_path, data, args.number, args.repeat)
+    encoder = "orjson" if orjson is not None else "json (orjson not installed)"
+
+    print(f"payload: {args.posts} posts, view={args.view}, {len(fast_path(data)):,} bytes")
+    print(f"APIResponse + jsonable_encoder: {model * 1e6:10.1f} us/request")
+    print(f"dump_json [{encoder}]: {fast * 1e6:10.1f} us/request")
+    print(f"saved: {(model - fast) * 1e6:.1f} us/request ({model / fast:.1f}x faster)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
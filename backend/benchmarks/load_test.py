@@ -0,0 +1,285 @@
+"""In-process load test for the portfolio API.
+
+Runs the FastAPI app through httpx's ASGI transport (no network, no
+uvicorn) against mongomock-motor, or against a real MongoDB when
+``--mongo-url`` is given, and drives concurrent load on each route.
+Throughput and p50/p95/p99 latencies are printed per scenario.
+
+After warm-up the plain blog list, search and profile scenarios are
+answered from the compressed response cache; their "uncached" counterparts
+send a non-matching If-None-Match, which the cache leaves to the route, so
+the handler, Mongo and serialization are measured too. "profile uncached"
+also clears the route's own profile cache before every request.
+
+    python benchmarks/load_test.py                          # run all scenarios
+    python benchmarks/load_test.py --save baseline.json     # record a baseline
+    python benchmarks/load_test.py --compare baseline.json  # fail on regressions
+
+With ``--compare`` the exit status is 1 when any scenario's p95 latency
+grew, or its throughput dropped, by more than ``--threshold`` (default 15%).
+Compare runs made on the same machine and Mongo backend only.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # Builds (path, json body) for the i-th request
+    request: Callable[[int], tuple]
+    headers: Optional[dict] = None
+    # Called before each request, outside the timed section
+    before: Optional[Callable[[], None]] = None
+
+
+# Conditional requests bypass the response cache, and this tag never matches
+BYPASS_RESPONSE_CACHE = {"If-None-Match": '"load-test"'}
+
+
+def build_scenarios(slugs: List[str]) -> List[Scenario]:
+    from routes.profile import profile_cache
+
+    def get(path):
+        return lambda i: (path, None)
+
+    def search(i):
+        return (f"/api/blog/?search={('virtual', 'social media', 'prod')[i % 3]}", None)
+
+    return [
+        Scenario("blog list", "GET", get("/api/blog/")),
+        Scenario("blog list uncached", "GET", get("/api/blog/"), BYPASS_RESPONSE_CACHE),
+        Scenario("blog list (list view)", "GET", get("/api/blog/?view=list&limit=20")),
+        Scenario("list view uncached", "GET", get("/api/blog/?view=list&limit=20"), BYPASS_RESPONSE_CACHE),
+        Scenario("blog list by category", "GET", get("/api/blog/?category=Productivity")),
+        Scenario("by category uncached", "GET", get("/api/blog/?category=Productivity"), BYPASS_RESPONSE_CACHE),
+        Scenario("blog search", "GET", search),
+        Scenario("blog search uncached", "GET", search, BYPASS_RESPONSE_CACHE),
+        Scenario("blog post by slug", "GET", lambda i: (f"/api/blog/{slugs[i % len(slugs)]}", None)),
+        Scenario("blog trending", "GET", get("/api/blog/trending")),
+        Scenario("profile", "GET", get("/api/profile/")),
+        Scenario("profile uncached", "GET", get("/api/profile/"), BYPASS_RESPONSE_CACHE, profile_cache.invalidate),
+        Scenario("analytics", "GET", get("/api/analytics/")),
+        Scenario("analytics series", "GET", get("/api/analytics/series?granularity=hour")),
+        Scenario("track view", "POST", lambda i: (f"/api/analytics/view?view_type={('website', 'blog')[i % 2]}", None)),
+        Scenario("contact submit", "POST", lambda i: ("/api/contact/", {
+            "name": f"Load Test {i}",
+            "email": f"load{i}@example.com",
+            "subject": "Benchmark inquiry",
+            "message": f"Message number {i} from the load test.",
+        })),
+        Scenario("contact inbox", "GET", get("/api/contact/?limit=50")),
+    ]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+async def run_scenario(http, scenario: Scenario, requests: int, concurrency: int) -> dict:
+    """Issue requests from concurrency workers and summarize their latencies"""
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            path, body = scenario.request(i)
+            if scenario.before is not None:
+                scenario.before()
+            started = time.perf_counter()
+            try:
+                response = await http.request(scenario.method, path, json=body, headers=scenario.headers)
+                status = response.status_code
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            if not isinstance(status, int) or status >= 400:
+                errors[str(status)] = errors.get(str(status), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+async def seed_posts(http, count: int) -> List[str]:
+    """Create extra published posts so list and search pages are realistic"""
+    categories = ["Productivity", "Business", "Social Media", "Tips"]
+    for i in range(count):
+        response = await http.post("/api/blog/", json={
+            "title": f"Load test post {i}: virtual assistant productivity",
+            "content": f"# Post {i}\n\n" + "Virtual assistants keep **small businesses** running. " * 60,
+            "category": categories[i % len(categories)],
+            "tags": ["Load Test"],
+            "image": "https://example.com/image.jpg",
+        })
+        response.raise_for_status()
+    listing = await http.get("/api/blog/?view=list&limit=100")
+    return [post["slug"] for post in listing.json()["data"]["posts"]]
+
+
+def use_mongomock():
+    """Point the database module at an in-memory mongomock-motor client"""
+    import motor.motor_asyncio
+    from mongomock_motor import AsyncMongoMockClient
+
+    class MockClient(AsyncMongoMockClient):
+        # The mock doesn't take the pool options or event listeners
+        def __init__(self, host=None, **kwargs):
+            super().__init__(host)
+
+    motor.motor_asyncio.AsyncIOMotorClient = MockClient
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    import httpx
+    import server
+
+    await server.startup_db()
+    try:
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as http:
+            slugs = await seed_posts(http, args.posts)
+            print_header()
+            results = {}
+            for scenario in build_scenarios(slugs):
+                if args.scenario and not any(name.lower() in scenario.name for name in args.scenario):
+                    continue
+                # A short warm-up so first-request costs (caches, pool) aren't measured
+                await run_scenario(http, scenario, min(args.requests, 20), 1)
+                results[scenario.name] = await run_scenario(http, scenario, args.requests, args.concurrency)
+                print_row(scenario.name, results[scenario.name])
+    finally:
+        if args.mongo_url and not args.keep_db:
+            # Drain buffered counters and jobs first so nothing is written after the drop
+            await server.job_queue.stop()
+            await server.analytics_counters.stop()
+            await server.contact_status_counters.stop()
+            await server.db.client.drop_database(server.db.name)
+        await server.shutdown_db()
+
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "backend": "mongodb" if args.mongo_url else "mongomock",
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "scenarios": results,
+    }
+
+
+def print_header():
+    print(f"{'scenario':<24} {'reqs':>6} {'errors':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+
+
+def print_row(name: str, result: dict):
+    errors = sum(result["errors"].values())
+    print(
+        f"{name:<24} {result['requests']:>6} {errors:>6} {result['throughput']:>9.1f} "
+        f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f}"
+    )
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """Describe every scenario that regressed beyond threshold"""
+    regressions = []
+    for name, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        p95_change = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] if before["p95_ms"] else 0.0
+        throughput_change = (before["throughput"] - result["throughput"]) / before["throughput"] if before["throughput"] else 0.0
+        line = (
+            f"{name:<24} p95 {before['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms ({p95_change:+.0%}), "
+            f"throughput {before['throughput']:.1f} -> {result['throughput']:.1f} req/s ({-throughput_change:+.0%})"
+        )
+        print(line)
+        if p95_change > threshold or throughput_change > threshold:
+            regressions.append(line)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="In-process load test for the portfolio API")
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent clients per scenario")
+    parser.add_argument("--posts", type=int, default=100, help="extra blog posts to seed")
+    parser.add_argument("--scenario", action="append", help="only run scenarios whose name contains this (repeatable)")
+    parser.add_argument("--mongo-url", help="run against this MongoDB instead of mongomock-motor")
+    parser.add_argument("--db-name", default="portfolio_loadtest", help="database used with --mongo-url")
+    parser.add_argument("--keep-db", action="store_true", help="don't drop the --mongo-url database afterwards")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="leave the contact/view rate limits on")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed p95/throughput regression")
+    args = parser.parse_args()
+
+    if args.mongo_url:
+        os.environ["MONGO_URL"] = args.mongo_url
+        os.environ["DB_NAME"] = args.db_name
+    else:
+        use_mongomock()
+    if not args.keep_rate_limits:
+        # Every simulated client shares one address, so the limits would reject most requests
+        os.environ["RATE_LIMIT_CONTACT_PER_MINUTE"] = "1000000000"
+        os.environ["RATE_LIMIT_VIEWS_PER_MINUTE"] = "1000000000"
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    results = asyncio.run(run(args))
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2))
+        print(f"Results saved to {args.save}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        print(f"\nCompared with {args.compare} (revision {baseline.get('revision')}):")
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} scenario(s) regressed by more than {args.threshold:.0%}")
+            return 1
+        print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
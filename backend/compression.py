@@ -0,0 +1,211 @@
+"""Response compression with a cache of pre-compressed variants.
+
+``CompressionMiddleware`` gzip- (and, when the ``brotli`` package is
+installed, brotli-) encodes buffered responses for clients that accept it.
+GET responses of side-effect-free routes listed in ``CACHEABLE_ROUTES`` are
+kept with every encoding already applied, keyed by path, query string and
+the collection version of the data behind them, so repeat requests skip
+the route, Mongo, serialization and compression altogether.
+
+Streaming responses (more than one body chunk), 304s and small bodies are
+passed through untouched.
+"""
+import gzip
+import os
+from typing import List, Optional, Tuple
+
+from cache import LRUCache
+from etags import collection_versions
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', '1024'))
+COMPRESSION_CACHE_SIZE = int(os.environ.get('COMPRESSION_CACHE_SIZE', '128'))
+COMPRESSION_CACHE_MAX_BODY = int(os.environ.get('COMPRESSION_CACHE_MAX_BODY', str(1024 * 1024)))
+
+# Cacheable GET routes and the collection whose version keys their entries
+CACHEABLE_ROUTES = {
+    "/api/profile": "profile",
+    "/api/blog": "blog_posts",
+}
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+# Cached variants are compressed once per collection version, so they can
+# afford a higher level than per-request compression
+_LEVELS = {
+    "br": {"live": 5, "cached": 11},
+    "gzip": {"live": 6, "cached": 9},
+}
+
+Headers = List[Tuple[bytes, bytes]]
+
+# Pre-compressed variants of cacheable responses; old collection versions
+# simply stop being looked up and age out
+response_variants = LRUCache(maxsize=COMPRESSION_CACHE_SIZE)
+
+
+def supported_encodings() -> List[str]:
+    """Encodings this process can produce, most preferred first"""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the preferred supported encoding allowed by an Accept-Encoding header"""
+    qualities = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in supported_encodings():
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    level = _LEVELS[encoding]["cached" if cached else "live"]
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def _header(headers: Headers, name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _encoded_headers(headers: Headers, encoding: Optional[str], length: int) -> Headers:
+    """Response headers for one encoding of a body"""
+    result = []
+    for key, value in headers:
+        lower = key.lower()
+        if lower in (b"content-length", b"content-encoding", b"vary"):
+            continue
+        if lower == b"etag" and encoding and not value.startswith(b"W/"):
+            # Each encoding is a different byte sequence, so a strong tag would be wrong
+            value = b"W/" + value
+        result.append((key, value))
+    result.append((b"content-length", str(length).encode()))
+    result.append((b"vary", b"Accept-Encoding"))
+    if encoding:
+        result.append((b"content-encoding", encoding.encode()))
+    return result
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses and caching pre-compressed variants"""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = COMPRESS_MIN_SIZE,
+        cacheable_routes: Optional[dict] = None,
+        cache: Optional[LRUCache] = None
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cacheable_routes = CACHEABLE_ROUTES if cacheable_routes is None else cacheable_routes
+        self.cache = response_variants if cache is None else cache
+
+    def _cache_key(self, scope, headers: Headers) -> Optional[tuple]:
+        if scope["method"] != "GET":
+            return None
+        # Conditional requests are left to the route, which answers them with a 304
+        if _header(headers, b"if-none-match") or _header(headers, b"if-modified-since"):
+            return None
+        collection = self.cacheable_routes.get(scope["path"].rstrip("/"))
+        if collection is None:
+            return None
+        return (scope["path"], scope.get("query_string", b""), collection_versions.token(collection))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = scope.get("headers", [])
+        encoding = choose_encoding((_header(request_headers, b"accept-encoding") or b"").decode("latin-1"))
+        cache_key = self._cache_key(scope, request_headers)
+
+        if cache_key is not None:
+            variants = self.cache.get(cache_key)
+            if variants is not None:
+                status, headers, bodies = variants
+                chosen = encoding if encoding in bodies else None
+                await self._send(send, status, _encoded_headers(headers, chosen, len(bodies[chosen])), bodies[chosen])
+                return
+
+        if encoding is None and cache_key is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        streaming = False
+
+        async def buffered_send(message):
+            nonlocal start_message, streaming
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if streaming:
+                await send(message)
+                return
+            if message["type"] != "http.response.body":
+                # zerocopysend/pathsend bodies can't be compressed; send them as they are
+                streaming = True
+                await send(start_message)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            status = start_message["status"]
+            headers = list(start_message.get("headers", []))
+            content_type = (_header(headers, b"content-type") or b"").decode("latin-1")
+
+            if message.get("more_body", False) or status != 200 or _header(headers, b"content-encoding"):
+                # Streams, 304s, errors and pre-encoded bodies go out as they are
+                streaming = True
+                await send(start_message)
+                await send(message)
+                return
+
+            eligible = len(body) >= self.minimum_size and content_type.startswith(COMPRESSIBLE_TYPES)
+            bodies = {None: body}
+            if cache_key is not None and len(body) <= COMPRESSION_CACHE_MAX_BODY and not _header(headers, b"set-cookie"):
+                if eligible:
+                    for name in supported_encodings():
+                        bodies[name] = compress(body, name, cached=True)
+                self.cache.set(cache_key, (status, headers, bodies))
+            elif eligible and encoding:
+                bodies[encoding] = compress(body, encoding)
+
+            chosen = encoding if encoding in bodies else None
+            if not eligible:
+                # Leave small and non-compressible responses byte-for-byte alone
+                await send(start_message)
+                await send(message)
+                return
+            await self._send(send, status, _encoded_headers(headers, chosen, len(bodies[chosen])), bodies[chosen])
+
+        await self.app(scope, receive, buffered_send)
+
+    @staticmethod
+    async def _send(send, status: int, headers: Headers, body: bytes):
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
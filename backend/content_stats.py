@@ -0,0 +1,55 @@
+import html
+import math
+import re
+
+WORDS_PER_MINUTE = 200
+EXCERPT_LENGTH = 160
+
+# Markdown/HTML constructs reduced to their visible text, in order
+_PLAIN_TEXT_RULES = [
+    (re.compile(r"```.*?```", re.DOTALL), " "),             # fenced code blocks
+    (re.compile(r"<[^>]+>"), " "),                           # HTML tags
+    (re.compile(r"!\[([^\]]*)\]\([^)]*\)"), r"\1"),          # images -> alt text
+    (re.compile(r"\[([^\]]*)\]\([^)]*\)"), r"\1"),           # links -> link text
+    (re.compile(r"^\s{0,3}(#{1,6}|>|[-*+]|\d+\.)\s+", re.MULTILINE), ""),  # headings, quotes, list markers
+    (re.compile(r"(\*\*|__|\*|_|~~|`)"), ""),                 # emphasis and inline code markers
+]
+_WHITESPACE = re.compile(r"\s+")
+_WORD = re.compile(r"\w+(?:['’-]\w+)*")
+
+
+def to_plain_text(content: str) -> str:
+    """Strip Markdown/HTML markup, leaving readable text"""
+    text = content or ""
+    for pattern, replacement in _PLAIN_TEXT_RULES:
+        text = pattern.sub(replacement, text)
+    return _WHITESPACE.sub(" ", html.unescape(text)).strip()
+
+
+def count_words(text: str) -> int:
+    """Number of words in plain text"""
+    return len(_WORD.findall(text))
+
+
+def reading_time(words: int) -> str:
+    """Reading time label in the format the frontend displays"""
+    return f"{max(1, math.ceil(words / WORDS_PER_MINUTE))} min read"
+
+
+def make_excerpt(text: str, length: int = EXCERPT_LENGTH) -> str:
+    """Leading plain text of at most length characters, cut on a word boundary"""
+    if len(text) <= length:
+        return text
+    cut = text[:length].rsplit(" ", 1)[0].rstrip(",;:.-")
+    return f"{cut}..."
+
+
+def content_fields(content: str) -> dict:
+    """Fields derived from a post body, computed once when it is written"""
+    plain_text = to_plain_text(content)
+    words = count_words(plain_text)
+    return {
+        "plainText": plain_text,
+        "wordCount": words,
+        "readTime": reading_time(words),
+    }
@@ -0,0 +1,271 @@
+import asyncio
+import logging
+import os
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from urllib.parse import unquote
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from database import analytics_collection, analytics_series_collection, blog_collection, counters_collection
+
+logger = logging.getLogger(__name__)
+
+# Values for a freshly created analytics document
+ANALYTICS_DEFAULTS = {
+    "id": "current",
+    "websiteViews": 0,
+    "blogViews": 0,
+    "contactInquiries": 0,
+    "socialMediaFollowers": 456,
+}
+
+# Time-series granularities, finest first, and how long each is retained
+# (None keeps buckets forever)
+SERIES_GRANULARITIES = ("minute", "hour", "day")
+SERIES_RETENTION = {
+    "minute": timedelta(days=int(os.environ.get('ANALYTICS_MINUTE_RETENTION_DAYS', '7'))),
+    "hour": timedelta(days=int(os.environ.get('ANALYTICS_HOUR_RETENTION_DAYS', '90'))),
+    "day": None,
+}
+
+
+def truncate_bucket(moment: datetime, granularity: str) -> datetime:
+    """Return the start of the bucket containing moment"""
+    if granularity == "minute":
+        return moment.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def encode_field_key(key: str) -> str:
+    """Escape a value for use as one component of a Mongo field path.
+
+    ``.`` would nest the field and a leading ``$`` is rejected by updates, so
+    both (and ``%`` itself) are percent-encoded; ``decode_field_key`` reverses it.
+    """
+    return key.replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
+
+def decode_field_key(key: str) -> str:
+    return unquote(key)
+
+
+# Write error codes worth retrying on a later flush: duplicate keys from
+# racing upserts, write conflicts and primaries stepping down. Anything else
+# (bad field names, type mismatches) would fail the same way every time
+RETRYABLE_WRITE_ERRORS = {11000, 112, 91, 189, 10107, 11600, 11602, 13435, 13436, 262, 50}
+
+
+def retryable_failures(error: BulkWriteError, description: str) -> List[int]:
+    """Indexes of the operations in an unordered bulk write worth retrying.
+
+    Operations missing from ``writeErrors`` were applied; failures that can
+    never succeed are logged and dropped.
+    """
+    retry = []
+    for write_error in error.details.get("writeErrors", []):
+        if write_error.get("code") in RETRYABLE_WRITE_ERRORS:
+            retry.append(write_error["index"])
+        else:
+            logger.error(f"Dropping {description} write: {write_error.get('errmsg')}")
+    return retry
+
+
+class CounterBuffer:
+    """Write-behind aggregator for analytics counters.
+
+    Increments are absorbed in memory and written as one combined ``$inc``
+    when the flush interval elapses or enough increments have piled up.
+    Each increment is also counted in its minute bucket; a flush rolls the
+    minute counts up into hour and day buckets with the same upserts, so
+    series queries read precomputed buckets only. Per-post views are
+    buffered the same way and written to each post's ``views`` field.
+    """
+
+    def __init__(
+        self,
+        collection,
+        document_filter: Optional[dict] = None,
+        defaults: Optional[dict] = None,
+        series_collection=None,
+        posts_collection=None,
+        flush_interval: float = 5.0,
+        flush_threshold: int = 500
+    ):
+        self.collection = collection
+        self.document_filter = document_filter or {}
+        self.defaults = defaults or {}
+        self.series_collection = series_collection
+        self.posts_collection = posts_collection
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._pending: Counter = Counter()
+        self._pending_series: Counter = Counter()
+        # Rolled-up bucket increments whose write failed and is retried as is
+        self._pending_buckets: Dict[tuple, Counter] = defaultdict(Counter)
+        self._pending_post_views: Counter = Counter()
+        self._pending_total = 0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._threshold_flush: Optional[asyncio.Task] = None
+
+    def incr(self, field: str, amount: int = 1):
+        """Record an increment without touching the database"""
+        self._pending[field] += amount
+        self.incr_series(field, amount)
+
+    def incr_series(self, key: str, amount: int = 1):
+        """Record an increment in the time series only"""
+        if self.series_collection is not None:
+            minute = truncate_bucket(datetime.utcnow(), "minute")
+            self._pending_series[(minute, key)] += amount
+        self._pending_total += amount
+        if self._pending_total >= self.flush_threshold and self._threshold_flush is None:
+            self._threshold_flush = asyncio.get_running_loop().create_task(self._flush_on_threshold())
+
+    def incr_post_view(self, slug: str, amount: int = 1):
+        """Record views of one blog post"""
+        if self.posts_collection is not None:
+            self._pending_post_views[slug] += amount
+        self.incr_series(f"posts.{encode_field_key(slug)}", amount)
+
+    def pending(self) -> Dict[str, int]:
+        """Increments recorded but not yet written"""
+        return dict(self._pending)
+
+    async def flush(self):
+        """Write all pending increments"""
+        async with self._lock:
+            increments, self._pending = self._pending, Counter()
+            series, self._pending_series = self._pending_series, Counter()
+            buckets, self._pending_buckets = self._pending_buckets, defaultdict(Counter)
+            post_views, self._pending_post_views = self._pending_post_views, Counter()
+            self._pending_total = 0
+
+            if increments:
+                try:
+                    await self._write_totals(increments)
+                except Exception as e:
+                    # Keep the increments so the next flush retries them
+                    self._pending.update(increments)
+                    self._pending_total += sum(increments.values())
+                    logger.error(f"Error flushing analytics counters: {e}")
+
+            # Roll minute counts up into every granularity's bucket
+            for (minute, key), amount in series.items():
+                for granularity in SERIES_GRANULARITIES:
+                    buckets[(granularity, truncate_bucket(minute, granularity))][f"counts.{key}"] += amount
+
+            if buckets:
+                try:
+                    await self._write_series(buckets)
+                except BulkWriteError as e:
+                    # Only the failed buckets are retried; the rest were written
+                    keys = list(buckets)
+                    for index in retryable_failures(e, "analytics series"):
+                        self._pending_buckets[keys[index]].update(buckets[keys[index]])
+                    logger.error(f"Error flushing analytics series: {e}")
+                except Exception as e:
+                    for key, counts in buckets.items():
+                        self._pending_buckets[key].update(counts)
+                    logger.error(f"Error flushing analytics series: {e}")
+
+            if post_views:
+                slugs = list(post_views)
+                try:
+                    await self.posts_collection.bulk_write(
+                        [UpdateOne({"slug": slug}, {"$inc": {"views": post_views[slug]}}) for slug in slugs],
+                        ordered=False
+                    )
+                except BulkWriteError as e:
+                    for index in retryable_failures(e, "post views"):
+                        self._pending_post_views[slugs[index]] += post_views[slugs[index]]
+                    logger.error(f"Error flushing post views: {e}")
+                except Exception as e:
+                    self._pending_post_views.update(post_views)
+                    logger.error(f"Error flushing post views: {e}")
+
+    async def _write_totals(self, increments: Counter):
+        defaults = {key: value for key, value in self.defaults.items() if key not in increments}
+        defaults["date"] = datetime.utcnow()
+        await self.collection.update_one(
+            self.document_filter,
+            {"$inc": dict(increments), "$setOnInsert": defaults},
+            upsert=True
+        )
+
+    async def _write_series(self, buckets: Dict[tuple, Counter]):
+        # One upsert per bucket, in the order of buckets
+        operations = []
+        for (granularity, bucket), counts in buckets.items():
+            on_insert = {}
+            retention = SERIES_RETENTION[granularity]
+            if retention is not None:
+                on_insert["expireAt"] = bucket + retention
+            update = {"$inc": dict(counts)}
+            if on_insert:
+                update["$setOnInsert"] = on_insert
+            operations.append(UpdateOne({"granularity": granularity, "bucket": bucket}, update, upsert=True))
+
+        await self.series_collection.bulk_write(operations, ordered=False)
+
+    async def _flush_on_threshold(self):
+        try:
+            await self.flush()
+        finally:
+            self._threshold_flush = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            # Shielded so stop() cancelling the loop never abandons a flush
+            # whose increments were already swapped out of the buffer
+            await asyncio.shield(self.flush())
+
+    async def start(self):
+        """Start the periodic background flush"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the background flush and write anything still pending.
+
+        A flush already in progress runs to completion; the final flush
+        waits for it on the lock.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._threshold_flush is not None:
+            await self._threshold_flush
+        await self.flush()
+
+
+# Shared buffer for the single analytics document
+analytics_counters = CounterBuffer(
+    analytics_collection,
+    defaults=ANALYTICS_DEFAULTS,
+    series_collection=analytics_series_collection,
+    posts_collection=blog_collection,
+    flush_interval=float(os.environ.get('ANALYTICS_FLUSH_INTERVAL', '5')),
+    flush_threshold=int(os.environ.get('ANALYTICS_FLUSH_THRESHOLD', '500'))
+)
+
+# Per-status contact totals, so the inbox never needs count_documents
+contact_status_counters = CounterBuffer(
+    counters_collection,
+    document_filter={"id": "contact_status"},
+    defaults={"id": "contact_status"},
+    flush_interval=float(os.environ.get('ANALYTICS_FLUSH_INTERVAL', '5')),
+    flush_threshold=int(os.environ.get('ANALYTICS_FLUSH_THRESHOLD', '500'))
+)
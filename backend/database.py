@@ -1,10 +1,40 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from db_monitoring import CommandMetrics, PoolMonitor, SlowQueryRecorder
+from content_stats import content_fields
+from rendering import content_hash, rendered_fields
+import asyncio
 import os
-from datetime import datetime
+from datetime import datetime, timezone
+
+def pool_options() -> dict:
+    """Connection pool settings, configurable from the environment"""
+    options = {
+        "maxPoolSize": int(os.environ.get('MONGO_MAX_POOL_SIZE', '100')),
+        "minPoolSize": int(os.environ.get('MONGO_MIN_POOL_SIZE', '0')),
+        "serverSelectionTimeoutMS": int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '30000')),
+    }
+    if os.environ.get('MONGO_MAX_IDLE_TIME_MS'):
+        options["maxIdleTimeMS"] = int(os.environ['MONGO_MAX_IDLE_TIME_MS'])
+    # e.g. "zstd,snappy,zlib"; zstd and snappy need the zstandard / python-snappy packages
+    if os.environ.get('MONGO_COMPRESSORS'):
+        options["compressors"] = os.environ['MONGO_COMPRESSORS']
+    return options
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+mongo_options = pool_options()
+pool_monitor = PoolMonitor()
+command_metrics = CommandMetrics()
+slow_query_recorder = SlowQueryRecorder(
+    threshold_ms=float(os.environ.get('SLOW_QUERY_MS', '100')),
+    buffer_size=int(os.environ.get('SLOW_QUERY_BUFFER', '200')),
+    explain=os.environ.get('SLOW_QUERY_EXPLAIN', 'true').lower() == 'true'
+)
+client = AsyncIOMotorClient(
+    mongo_url,
+    event_listeners=[pool_monitor, command_metrics, slow_query_recorder],
+    **mongo_options
+)
 db = client[os.environ.get('DB_NAME', 'portfolio_db')]
 
 # Collections
@@ -12,6 +42,15 @@ profile_collection = db.profile
 contacts_collection = db.contacts
 blog_collection = db.blog_posts
 analytics_collection = db.analytics
+analytics_series_collection = db.analytics_series
+counters_collection = db.counters
+outbox_collection = db.job_outbox
+
+def to_naive_utc(moment: datetime) -> datetime:
+    """Normalize a datetime to the naive UTC values stored in Mongo"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
 
 async def init_database():
     """Initialize database with default data"""
@@ -102,6 +141,38 @@ async def init_database():
         
         await blog_collection.insert_many(sample_posts)
         print("✅ Sample blog posts created")
+    
+    # Backfill reading stats on posts written before they were derived on write
+    backfilled = 0
+    async for post in blog_collection.find({"wordCount": {"$exists": False}}, {"_id": 0, "id": 1, "content": 1}):
+        derived = content_fields(post.get("content", ""))
+        derived.pop("readTime")
+        await blog_collection.update_one({"id": post["id"]}, {"$set": derived})
+        backfilled += 1
+    if backfilled:
+        print(f"✅ Reading stats backfilled on {backfilled} blog posts")
+    
+    # Render posts stored before HTML was rendered on write, or by an older
+    # renderer (the hash covers RENDER_VERSION)
+    rendered = 0
+    async for post in blog_collection.find({}, {"_id": 0, "id": 1, "content": 1, "contentHash": 1}):
+        if post.get("contentHash") == content_hash(post.get("content", "")):
+            continue
+        await blog_collection.update_one(
+            {"id": post["id"], "contentHash": post.get("contentHash")},
+            {"$set": rendered_fields(post.get("content", ""))}
+        )
+        rendered += 1
+    if rendered:
+        print(f"✅ HTML rendered for {rendered} blog posts")
+
+async def warm_pool():
+    """Open pool connections up front so the first requests don't pay for them"""
+    connections = int(os.environ.get('MONGO_WARM_CONNECTIONS', max(mongo_options["minPoolSize"], 1)))
+    connections = min(connections, mongo_options["maxPoolSize"])
+    # Concurrent pings each check out (and so create) their own connection
+    await asyncio.gather(*(client.admin.command("ping") for _ in range(connections)))
+    return connections
 
 async def close_database():
     """Close database connection"""
@@ -0,0 +1,263 @@
+import hashlib
+import json
+import threading
+from collections import deque
+from datetime import datetime
+
+from pymongo import monitoring
+
+from indexes import plan_stages
+from metrics import current_request_scope, mongo_command_duration, mongo_command_failures, route_template
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Tracks Motor/PyMongo connection pool activity.
+
+    Listener callbacks run on driver threads, so counters are guarded by a lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pools = 0
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self.checkout_failures = 0
+        self.max_waiting = 0
+        self.clears = 0
+
+    def _change(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def pool_created(self, event):
+        self._change(pools=1)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._change(clears=1)
+
+    def pool_closed(self, event):
+        self._change(pools=-1)
+
+    def connection_created(self, event):
+        self._change(created=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._change(closed=1)
+
+    def connection_check_out_started(self, event):
+        self._change(waiting=1)
+
+    def connection_check_out_failed(self, event):
+        self._change(waiting=-1, checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._change(waiting=-1, checked_out=1)
+
+    def connection_checked_in(self, event):
+        self._change(checked_out=-1)
+
+    def stats(self) -> dict:
+        """Snapshot of the pool counters"""
+        with self._lock:
+            return {
+                "pools": self.pools,
+                "open": self.created - self.closed,
+                "checkedOut": self.checked_out,
+                "waiting": self.waiting,
+                "maxWaiting": self.max_waiting,
+                "created": self.created,
+                "closed": self.closed,
+                "checkoutFailures": self.checkout_failures,
+                "clears": self.clears,
+            }
+
+
+def command_collection(command_name: str, command: dict) -> str:
+    """Collection a command targets, or "-" for database/admin commands"""
+    if command_name == "getMore":
+        return command.get("collection") or "-"
+    target = command.get(command_name)
+    return target if isinstance(target, str) else "-"
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Times every Mongo command into the metrics registry.
+
+    Only started events carry the command document, so the collection is
+    remembered per request id until the matching succeeded/failed event.
+    """
+
+    def __init__(self):
+        self._pending = {}
+
+    def started(self, event):
+        self._pending[(event.connection_id, event.request_id)] = command_collection(event.command_name, event.command)
+
+    def _finish(self, event) -> str:
+        return self._pending.pop((event.connection_id, event.request_id), "-")
+
+    def succeeded(self, event):
+        collection = self._finish(event)
+        mongo_command_duration.observe(event.duration_micros / 1e6, collection, event.command_name)
+
+    def failed(self, event):
+        collection = self._finish(event)
+        mongo_command_duration.observe(event.duration_micros / 1e6, collection, event.command_name)
+        mongo_command_failures.inc(collection, event.command_name)
+
+
+# Commands worth explaining, and where each keeps its query filter
+_FILTER_FIELDS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "aggregate": "pipeline",
+}
+# Driver, session and concern fields that must not be sent back inside an explain
+_EXCLUDED_FIELDS = {"lsid", "txnNumber", "autocommit", "startTransaction", "signature", "readConcern", "writeConcern"}
+
+
+def query_shape(value):
+    """Replace the literal values in a filter with "?", keeping fields and operators"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, dict) for item in value):
+            # $or/$and branches and pipeline stages keep their structure
+            return [query_shape(item) for item in value]
+        return ["?"] if value else []
+    return "?"
+
+
+def command_filter(command_name: str, command: dict):
+    """The filter (or pipeline) part of a command, if it has one"""
+    if command_name in _FILTER_FIELDS:
+        return command.get(_FILTER_FIELDS[command_name], {})
+    if command_name == "update":
+        return [{"q": statement.get("q", {})} for statement in command.get("updates", [])[:1]]
+    if command_name == "delete":
+        return [{"q": statement.get("q", {})} for statement in command.get("deletes", [])[:1]]
+    return None
+
+
+class SlowQueryRecorder(monitoring.CommandListener):
+    """Keeps the most recent Mongo commands slower than a threshold.
+
+    Each record carries the command's filter shape (literals replaced by
+    "?"), its duration and the route whose request issued it, taken from
+    the request scope the metrics middleware puts in a contextvar (Motor
+    copies the context into its executor threads). With explain on, the
+    first slow occurrence of each shape is explained once on the event loop
+    and its plan kept alongside.
+    """
+
+    def __init__(self, threshold_ms: float = 100.0, buffer_size: int = 200, explain: bool = True, max_plans: int = 500):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.max_plans = max_plans
+        self.records = deque(maxlen=buffer_size)
+        self.plans = {}
+        self._pending = {}
+        self._loop = None
+        self._db = None
+
+    def bind(self, loop, db):
+        """Event loop and database to run explain() on"""
+        self._loop = loop
+        self._db = db
+
+    def started(self, event):
+        if event.command_name == "explain":
+            return
+        scope = current_request_scope.get()
+        self._pending[(event.connection_id, event.request_id)] = (event.command, scope)
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool = False):
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        duration_ms = event.duration_micros / 1000
+        if pending is None or duration_ms < self.threshold_ms:
+            return
+
+        command, scope = pending
+        collection = command_collection(event.command_name, command)
+        sort = command.get("sort")
+        shape = {
+            "filter": query_shape(command_filter(event.command_name, command)),
+            "sort": [[key, direction] for key, direction in sort.items()] if isinstance(sort, dict) else None,
+        }
+        shape_id = hashlib.sha1(
+            f"{event.database_name}.{collection}:{event.command_name}:{json.dumps(shape, sort_keys=True, default=str)}".encode()
+        ).hexdigest()[:12]
+
+        self.records.append({
+            "at": datetime.utcnow(),
+            "durationMs": round(duration_ms, 2),
+            "collection": collection,
+            "command": event.command_name,
+            "shapeId": shape_id,
+            "shape": shape,
+            "route": f"{scope['method']} {route_template(scope)}" if scope else "background",
+            "failed": failed,
+        })
+
+        if (
+            self.explain
+            and shape_id not in self.plans
+            and len(self.plans) < self.max_plans
+            and event.command_name in _FILTER_FIELDS
+            and self._loop is not None
+        ):
+            self.plans[shape_id] = {"status": "pending"}
+            explained = {key: value for key, value in command.items() if key not in _EXCLUDED_FIELDS and not key.startswith("$")}
+            # Listener callbacks run on driver threads; explain from the loop
+            self._loop.call_soon_threadsafe(
+                lambda: self._loop.create_task(self._explain(shape_id, explained, event.database_name))
+            )
+
+    async def _explain(self, shape_id: str, command: dict, database_name: str):
+        try:
+            result = await self._db.client[database_name].command(
+                {"explain": command, "verbosity": "queryPlanner"}
+            )
+            winning_plan = result.get("queryPlanner", {}).get("winningPlan", {})
+            stages = plan_stages(winning_plan)
+            self.plans[shape_id] = {
+                "status": "ok",
+                "stages": stages,
+                "collscan": "COLLSCAN" in stages,
+                "winningPlan": winning_plan,
+            }
+        except Exception as e:
+            self.plans[shape_id] = {"status": "failed", "error": str(e)}
+
+    def snapshot(self, limit: int = None) -> dict:
+        """Recorded slow commands, newest first, with their captured plans"""
+        records = list(self.records)[::-1][:limit]
+        return {
+            "thresholdMs": self.threshold_ms,
+            "explain": self.explain,
+            "queries": records,
+            "plans": {record["shapeId"]: self.plans[record["shapeId"]] for record in records if record["shapeId"] in self.plans},
+        }
+
+    def clear(self):
+        """Drop recorded commands and plans so shapes get explained again"""
+        self.records.clear()
+        self.plans.clear()
@@ -0,0 +1,97 @@
+import hashlib
+import os
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+# Upper bound, in seconds, on how long a version-derived ETag stays valid.
+# Versions are per process, so a write handled by another worker is only
+# guaranteed to show up here once the epoch rolls over.
+ETAG_MAX_AGE = float(os.environ.get('ETAG_MAX_AGE', '60'))
+
+
+class CollectionVersions:
+    """Per-collection version counters bumped by the write routes"""
+
+    def __init__(self, max_age: float = ETAG_MAX_AGE):
+        self.max_age = max_age
+        self._boot_id = uuid.uuid4().hex[:8]
+        self._versions = defaultdict(int)
+
+    def bump(self, collection_name: str):
+        """Mark a collection as changed"""
+        self._versions[collection_name] += 1
+
+    def token(self, collection_name: str) -> str:
+        """Opaque token that changes whenever the collection may have changed"""
+        epoch = int(time.time() // self.max_age) if self.max_age > 0 else 0
+        return f"{self._boot_id}.{self._versions[collection_name]}.{epoch}"
+
+
+collection_versions = CollectionVersions()
+
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from the given parts"""
+    digest = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode()
+        elif not isinstance(part, bytes):
+            part = repr(part).encode()
+        digest.update(part)
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()[:24]}"'
+
+
+def http_date(moment: datetime) -> str:
+    """Format a naive UTC datetime as an HTTP date"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return format_datetime(moment.astimezone(timezone.utc), usegmt=True)
+
+
+def _opaque_tag(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Evaluate If-None-Match (or, without it, If-Modified-Since) against a validator"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        # If-None-Match uses weak comparison, so W/ prefixes are ignored
+        return any(_opaque_tag(tag) == _opaque_tag(etag) for tag in candidates)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+
+    return False
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> dict:
+    """Headers that let clients revalidate instead of re-downloading"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def not_modified_response(etag: str, last_modified: Optional[datetime] = None) -> Response:
+    """Empty 304 response carrying the current validators"""
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
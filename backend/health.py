@@ -0,0 +1,128 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Optional
+
+from database import client, mongo_options, pool_monitor
+
+# Readiness thresholds
+READINESS_PING_TIMEOUT = float(os.environ.get('READINESS_PING_TIMEOUT', '1.0'))
+READINESS_MAX_LOOP_LAG_MS = float(os.environ.get('READINESS_MAX_LOOP_LAG_MS', '500'))
+READINESS_MAX_POOL_SATURATION = float(os.environ.get('READINESS_MAX_POOL_SATURATION', '0.95'))
+# Probes inside this window share one check result
+READINESS_CACHE_SECONDS = float(os.environ.get('READINESS_CACHE_SECONDS', '2'))
+
+
+class LoopLagMonitor:
+    """Samples event-loop lag: how late a periodic sleep wakes up"""
+
+    def __init__(self, interval: float = 0.5, window: int = 20):
+        self.interval = interval
+        self._samples = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self._samples.append(max(0.0, loop.time() - expected))
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict:
+        """Latest and worst lag over the recent window, in milliseconds"""
+        samples = list(self._samples)
+        return {
+            "lastMs": round(samples[-1] * 1000, 2) if samples else 0.0,
+            "maxMs": round(max(samples) * 1000, 2) if samples else 0.0,
+        }
+
+
+class ReadinessCheck:
+    """Dependency checks behind /api/health/ready, cached for a short window.
+
+    Concurrent probes while a check is running wait for that same check
+    rather than each pinging Mongo.
+    """
+
+    def __init__(self, client, pool_monitor, max_pool_size: int, lag_monitor: LoopLagMonitor):
+        self.client = client
+        self.pool_monitor = pool_monitor
+        self.max_pool_size = max_pool_size
+        self.lag_monitor = lag_monitor
+        self.initialized = False
+        self.init_error: Optional[str] = None
+        self.started_at = time.time()
+        self._result: Optional[dict] = None
+        self._checked_at = 0.0
+        self._running: Optional[asyncio.Task] = None
+
+    def mark_initialized(self):
+        self.initialized = True
+        self.init_error = None
+
+    def mark_failed(self, error: Exception):
+        self.initialized = False
+        self.init_error = str(error)
+
+    async def _ping(self) -> dict:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.client.admin.command("ping"), READINESS_PING_TIMEOUT)
+        except asyncio.TimeoutError:
+            return {"ok": False, "error": f"ping timed out after {READINESS_PING_TIMEOUT}s"}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+        return {"ok": True, "latencyMs": round((time.perf_counter() - started) * 1000, 2)}
+
+    async def _check(self) -> dict:
+        pool = self.pool_monitor.stats()
+        saturation = pool["checkedOut"] / self.max_pool_size if self.max_pool_size else 0.0
+        lag = self.lag_monitor.stats()
+        checks = {
+            "init": {"ok": self.initialized, **({"error": self.init_error} if self.init_error else {})},
+            "mongo": await self._ping(),
+            "pool": {
+                "ok": saturation < READINESS_MAX_POOL_SATURATION,
+                "saturation": round(saturation, 3),
+                "checkedOut": pool["checkedOut"],
+                "waiting": pool["waiting"],
+                "maxPoolSize": self.max_pool_size,
+            },
+            "eventLoop": {"ok": lag["maxMs"] < READINESS_MAX_LOOP_LAG_MS, **lag},
+        }
+        ready = all(check["ok"] for check in checks.values())
+        return {"status": "ready" if ready else "unavailable", "checks": checks}
+
+    async def result(self) -> dict:
+        """Latest check result, re-run once the cached one is older than the window"""
+        if self._result is not None and time.monotonic() - self._checked_at < READINESS_CACHE_SECONDS:
+            return self._result
+        if self._running is None:
+            self._running = asyncio.get_running_loop().create_task(self._check())
+        running = self._running
+        try:
+            result = await asyncio.shield(running)
+        finally:
+            if self._running is running and running.done():
+                self._running = None
+        self._result = result
+        self._checked_at = time.monotonic()
+        return result
+
+    def uptime(self) -> float:
+        return round(time.time() - self.started_at, 1)
+
+
+loop_lag_monitor = LoopLagMonitor()
+readiness = ReadinessCheck(client, pool_monitor, mongo_options["maxPoolSize"], loop_lag_monitor)
@@ -0,0 +1,98 @@
+"""Resized WebP/JPEG variants of uploaded images.
+
+Decoding and resizing are CPU-bound, so ``generate_variants`` runs them in a
+process pool and keeps them off the event loop. Every variant is named after
+the SHA-256 of its own bytes, so a URL always refers to the same image and
+can be cached forever.
+"""
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+# Bounding box (longest edge, in pixels) of each variant; images are never upscaled
+PROFILE_VARIANTS = {"thumb": 96, "1x": 400, "2x": 800}
+
+# extension -> (Pillow format, content type, save options)
+OUTPUT_FORMATS = {
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", "image/jpeg", {"quality": 85, "optimize": True, "progressive": True}),
+}
+
+# Refuse decompression bombs well before they exhaust a worker's memory
+MAX_IMAGE_PIXELS = int(os.environ.get('MAX_IMAGE_PIXELS', '40000000'))
+IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', '2'))
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def render_variants(source: str, output_dir: str, sizes: dict) -> List[dict]:
+    """Decode source and write each size in each output format (runs in a worker process)"""
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    try:
+        with Image.open(source) as opened:
+            image = ImageOps.exif_transpose(opened)
+            image.load()
+    except (Image.UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise ValueError(f"Unsupported or corrupt image: {e}")
+
+    if image.mode in ("RGBA", "LA", "P"):
+        # JPEG has no alpha channel; flatten transparency onto white
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+
+    variants = []
+    for name, edge in sizes.items():
+        resized = image.copy()
+        resized.thumbnail((edge, edge), Image.LANCZOS)
+        for extension, (image_format, content_type, options) in OUTPUT_FORMATS.items():
+            buffer = io.BytesIO()
+            # Saved without the source's EXIF, so camera and GPS metadata are dropped
+            resized.save(buffer, image_format, **options)
+            data = buffer.getvalue()
+            key = f"{hashlib.sha256(data).hexdigest()[:32]}.{extension}"
+            path = Path(output_dir) / key
+            path.write_bytes(data)
+            variants.append({
+                "variant": name,
+                "format": extension,
+                "key": key,
+                "path": str(path),
+                "contentType": content_type,
+                "width": resized.width,
+                "height": resized.height,
+                "size": len(data),
+            })
+    return variants
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn, not fork: the parent runs driver threads that a fork would copy mid-flight
+        _pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+async def generate_variants(source: Path, output_dir: Path, sizes: dict = PROFILE_VARIANTS) -> List[dict]:
+    """Render the resized variants of source into output_dir in the process pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), render_variants, str(source), str(output_dir), sizes)
+
+
+def shutdown_pool():
+    """Stop the image worker processes"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
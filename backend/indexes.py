@@ -0,0 +1,199 @@
+"""Declarative MongoDB index registry.
+
+``ensure_indexes`` creates every index in ``INDEXES`` at startup; creation is
+idempotent, so it is safe to run on every boot. ``check_query_plans`` explains
+the queries the routes issue and reports any that still fall back to a
+collection scan. Run ``python indexes.py --check`` to do both from a shell.
+"""
+import asyncio
+import logging
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IndexSpec:
+    collection: str
+    keys: List[Tuple[str, int]]
+    unique: bool = False
+    options: dict = field(default_factory=dict)
+
+    @property
+    def name(self) -> str:
+        return "_".join(f"{key}_{direction}" for key, direction in self.keys)
+
+
+@dataclass
+class QueryShape:
+    route: str
+    collection: str
+    filter: dict
+    sort: Optional[List[Tuple[str, int]]] = None
+
+
+INDEXES = [
+    # Blog posts: slug lookups, id updates and the (filtered) keyset listing
+    IndexSpec("blog_posts", [("slug", 1)], unique=True),
+    IndexSpec("blog_posts", [("id", 1)], unique=True),
+    IndexSpec("blog_posts", [("published", 1), ("category", 1), ("createdAt", -1), ("id", -1)]),
+    IndexSpec("blog_posts", [("published", 1), ("createdAt", -1), ("id", -1)]),
+
+    # Contacts: id updates and newest-first inbox listing
+    IndexSpec("contacts", [("id", 1)], unique=True),
+    IndexSpec("contacts", [("createdAt", -1), ("id", -1)]),
+    IndexSpec("contacts", [("status", 1), ("createdAt", -1), ("id", -1)]),
+
+    # Singleton documents still get an id index so every collection has one
+    IndexSpec("profile", [("id", 1)], unique=True),
+    IndexSpec("analytics", [("id", 1)], unique=True),
+    IndexSpec("counters", [("id", 1)], unique=True),
+
+    # Job outbox: lookups by id and lapsed-lease recovery scans
+    IndexSpec("job_outbox", [("id", 1)], unique=True),
+    IndexSpec("job_outbox", [("status", 1), ("lockedUntil", 1)]),
+
+    # Analytics time series: one bucket per (granularity, start), minute and
+    # hour buckets expire through their expireAt
+    IndexSpec("analytics_series", [("granularity", 1), ("bucket", 1)], unique=True),
+    IndexSpec("analytics_series", [("expireAt", 1)], options={"expireAfterSeconds": 0}),
+]
+
+# Representative queries issued by the routes. The profile and analytics
+# singletons are read with an empty filter by design and are left out.
+_SAMPLE_DATE = datetime(2025, 1, 1)
+QUERY_SHAPES = [
+    QueryShape("GET /api/blog", "blog_posts", {"published": True}, [("createdAt", -1), ("id", -1)]),
+    QueryShape("GET /api/blog?category=", "blog_posts", {"published": True, "category": "Business"}, [("createdAt", -1), ("id", -1)]),
+    QueryShape(
+        "GET /api/blog?cursor=",
+        "blog_posts",
+        {
+            "published": True,
+            "$or": [
+                {"createdAt": {"$lt": _SAMPLE_DATE}},
+                {"createdAt": _SAMPLE_DATE, "id": {"$lt": "post"}},
+            ],
+        },
+        [("createdAt", -1), ("id", -1)],
+    ),
+    QueryShape("GET /api/blog?search=", "blog_posts", {"published": True, "id": {"$in": ["post1", "post2"]}}),
+    QueryShape("GET /api/blog/trending", "blog_posts", {"slug": {"$in": ["a", "b"]}, "published": True}),
+    QueryShape("GET /api/blog/{slug}", "blog_posts", {"slug": "sample", "published": True}),
+    QueryShape("PUT/DELETE /api/blog/{id}", "blog_posts", {"id": "post1"}),
+    QueryShape("GET /api/contact", "contacts", {}, [("createdAt", -1), ("id", -1)]),
+    QueryShape(
+        "GET /api/contact/export?status=&from=",
+        "contacts",
+        {"status": "new", "createdAt": {"$gte": _SAMPLE_DATE}},
+        [("createdAt", -1), ("id", -1)],
+    ),
+    QueryShape("PUT/DELETE /api/contact/{id}", "contacts", {"id": "contact"}),
+    QueryShape("job queue recovery", "job_outbox", {"status": "pending", "lockedUntil": {"$lt": _SAMPLE_DATE}}),
+    QueryShape(
+        "GET /api/analytics/series",
+        "analytics_series",
+        {"granularity": "hour", "bucket": {"$gte": _SAMPLE_DATE, "$lt": _SAMPLE_DATE}},
+        [("bucket", 1)],
+    ),
+]
+
+
+class UniqueIndexError(RuntimeError):
+    """A unique index could not be built, so the code relying on it is unsafe"""
+
+
+async def ensure_indexes(db, strict: bool = False) -> List[dict]:
+    """Create every registered index, logging individual failures.
+
+    With strict, a failed unique index raises UniqueIndexError once every
+    index has been attempted: routes rely on those for correctness (e.g. slug
+    allocation retrying on DuplicateKeyError), not just speed.
+    """
+    results = []
+    for spec in INDEXES:
+        try:
+            await db[spec.collection].create_index(
+                spec.keys, name=spec.name, unique=spec.unique, **spec.options
+            )
+            results.append({"collection": spec.collection, "index": spec.name, "unique": spec.unique, "ok": True})
+        except Exception as e:
+            logger.error(f"Error creating index {spec.collection}.{spec.name}: {e}")
+            results.append({
+                "collection": spec.collection, "index": spec.name, "unique": spec.unique, "ok": False, "error": str(e)
+            })
+    failed_unique = [f"{result['collection']}.{result['index']}" for result in results if result["unique"] and not result["ok"]]
+    if strict and failed_unique:
+        raise UniqueIndexError(f"Unique indexes could not be built: {', '.join(failed_unique)}")
+    return results
+
+
+def plan_stages(plan) -> List[str]:
+    """Collect every stage name in an explain() plan tree"""
+    stages = []
+    if isinstance(plan, dict):
+        if isinstance(plan.get("stage"), str):
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(plan_stages(item))
+    return stages
+
+
+async def check_query_plans(db) -> List[dict]:
+    """Explain each registered query shape and flag collection scans"""
+    report = []
+    for shape in QUERY_SHAPES:
+        cursor = db[shape.collection].find(shape.filter)
+        if shape.sort:
+            cursor = cursor.sort(shape.sort)
+        try:
+            explanation = await cursor.explain()
+        except Exception as e:
+            report.append({"route": shape.route, "collection": shape.collection, "error": str(e)})
+            continue
+
+        stages = plan_stages(explanation.get("queryPlanner", {}).get("winningPlan", {}))
+        report.append({
+            "route": shape.route,
+            "collection": shape.collection,
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+        })
+    return report
+
+
+async def _main(check: bool) -> int:
+    from database import db, close_database
+
+    failed = 0
+    for result in await ensure_indexes(db):
+        status = "ok" if result["ok"] else f"FAILED ({result['error']})"
+        print(f"{result['collection']}.{result['index']}: {status}")
+        failed += not result["ok"]
+
+    if check:
+        for entry in await check_query_plans(db):
+            if "error" in entry:
+                print(f"{entry['route']}: explain failed ({entry['error']})")
+                failed += 1
+            else:
+                verdict = "COLLSCAN" if entry["collscan"] else "ok"
+                print(f"{entry['route']}: {verdict} [{' > '.join(entry['stages'])}]")
+                failed += entry["collscan"]
+
+    await close_database()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    from pathlib import Path
+    from dotenv import load_dotenv
+
+    load_dotenv(Path(__file__).parent / '.env')
+    sys.exit(asyncio.run(_main(check="--check" in sys.argv)))
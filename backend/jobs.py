@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import os
+import random
+import uuid
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+from database import outbox_collection
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict], Awaitable[None]]
+
+
+class JobQueue:
+    """In-process asyncio job queue with retries, backoff and a dead-letter list.
+
+    With an outbox collection, each job is written to Mongo before it is queued
+    and removed once it succeeds. Jobs still pending when a process dies keep a
+    lease (``lockedUntil``); once it lapses, the next process to start claims
+    and re-queues them, so accepted work survives restarts.
+
+    Recovered jobs can run twice, so only job types whose handler makes a
+    durable, idempotent change should be persisted; register anything else
+    with ``persist=False`` and it stays in memory only.
+    """
+
+    def __init__(
+        self,
+        outbox_collection=None,
+        workers: int = 2,
+        max_attempts: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        lease: float = 300.0,
+        dead_letter_size: int = 100
+    ):
+        self.outbox_collection = outbox_collection
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease = timedelta(seconds=lease)
+        self.dead_letters = deque(maxlen=dead_letter_size)
+        self._handlers: Dict[str, JobHandler] = {}
+        self._persisted_types = set()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._retry_handles: Dict[str, asyncio.TimerHandle] = {}
+        self._in_flight = 0
+        self._processed = 0
+        self._retried = 0
+        self._dead = 0
+
+    def handler(self, job_type: str, persist: bool = True):
+        """Register the coroutine that processes one job type"""
+        def register(func: JobHandler) -> JobHandler:
+            self._handlers[job_type] = func
+            if persist:
+                self._persisted_types.add(job_type)
+            else:
+                self._persisted_types.discard(job_type)
+            return func
+        return register
+
+    async def enqueue(self, job_type: str, payload: dict) -> str:
+        """Record a job (durably, if its type is persisted) and hand it to the workers"""
+        if job_type not in self._handlers:
+            raise ValueError(f"No handler registered for job type '{job_type}'")
+
+        now = datetime.utcnow()
+        job = {
+            "id": str(uuid.uuid4()),
+            "type": job_type,
+            "payload": payload,
+            "attempts": 0,
+            "status": "pending",
+            "createdAt": now,
+            "lockedUntil": now + self.lease,
+        }
+        job["persisted"] = self.outbox_collection is not None and job_type in self._persisted_types
+        if job["persisted"]:
+            await self.outbox_collection.insert_one(dict(job))
+        self._get_queue().put_nowait(job)
+        return job["id"]
+
+    def _get_queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        return self._queue
+
+    async def _recover(self):
+        """Claim pending jobs whose lease has lapsed and queue them again"""
+        if self.outbox_collection is None:
+            return
+        recovered = 0
+        while True:
+            now = datetime.utcnow()
+            job = await self.outbox_collection.find_one_and_update(
+                {"status": "pending", "lockedUntil": {"$lt": now}},
+                {"$set": {"lockedUntil": now + self.lease}},
+                projection={"_id": 0}
+            )
+            if job is None:
+                break
+            self._get_queue().put_nowait(job)
+            recovered += 1
+        if recovered:
+            logger.info(f"Recovered {recovered} pending jobs from the outbox")
+
+    async def _run_job(self, job: dict):
+        handler = self._handlers.get(job["type"])
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job type '{job['type']}'")
+            await handler(job["payload"])
+        except Exception as e:
+            await self._job_failed(job, e)
+            return
+
+        self._processed += 1
+        if self._is_persisted(job):
+            await self.outbox_collection.delete_one({"id": job["id"]})
+
+    async def _job_failed(self, job: dict, error: Exception):
+        job["attempts"] += 1
+        job["lastError"] = str(error)
+
+        if job["attempts"] >= self.max_attempts:
+            self._dead += 1
+            job["status"] = "dead"
+            self.dead_letters.append(job)
+            logger.error(f"Job {job['id']} ({job['type']}) failed permanently: {error}")
+            update = {"status": "dead", "attempts": job["attempts"], "lastError": job["lastError"]}
+        else:
+            # Exponential backoff with jitter
+            delay = min(self.max_delay, self.base_delay * 2 ** (job["attempts"] - 1))
+            delay *= random.uniform(0.5, 1.0)
+            self._retried += 1
+            logger.warning(f"Job {job['id']} ({job['type']}) failed, retrying in {delay:.1f}s: {error}")
+            update = {
+                "attempts": job["attempts"],
+                "lastError": job["lastError"],
+                "lockedUntil": datetime.utcnow() + timedelta(seconds=delay) + self.lease,
+            }
+            self._retry_handles[job["id"]] = asyncio.get_running_loop().call_later(delay, self._requeue, job)
+
+        if self._is_persisted(job):
+            await self.outbox_collection.update_one({"id": job["id"]}, {"$set": update})
+
+    def _is_persisted(self, job: dict) -> bool:
+        # Jobs recovered from the outbox predate the flag
+        return self.outbox_collection is not None and job.get("persisted", True)
+
+    def _requeue(self, job: dict):
+        self._retry_handles.pop(job["id"], None)
+        self._get_queue().put_nowait(job)
+
+    async def _worker(self):
+        queue = self._get_queue()
+        while True:
+            job = await queue.get()
+            self._in_flight += 1
+            try:
+                await self._run_job(job)
+            except Exception as e:
+                logger.error(f"Error processing job {job.get('id')}: {e}")
+            finally:
+                self._in_flight -= 1
+                queue.task_done()
+
+    async def start(self):
+        """Recover orphaned jobs and start the workers"""
+        if self._tasks:
+            return
+        await self._recover()
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 10.0):
+        """Let queued jobs finish (up to timeout), then stop the workers.
+
+        Jobs waiting on a retry stay pending in the outbox and are picked up
+        again after their lease lapses.
+        """
+        for handle in self._retry_handles.values():
+            handle.cancel()
+        self._retry_handles.clear()
+
+        if self._queue is not None and self._tasks:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Stopping job queue with {self._queue.qsize()} jobs still queued")
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        """Queue counters for monitoring"""
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "inFlight": self._in_flight,
+            "waitingRetry": len(self._retry_handles),
+            "processed": self._processed,
+            "retried": self._retried,
+            "dead": self._dead,
+            "workers": len(self._tasks),
+            "persistent": self.outbox_collection is not None,
+        }
+
+
+# Shared queue for post-processing that shouldn't run on the request path
+job_queue = JobQueue(
+    outbox_collection=outbox_collection if os.environ.get('JOB_QUEUE_PERSIST', 'true').lower() == 'true' else None,
+    workers=int(os.environ.get('JOB_QUEUE_WORKERS', '2')),
+    max_attempts=int(os.environ.get('JOB_QUEUE_MAX_ATTEMPTS', '5'))
+)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 import uuid
 
@@ -13,6 +13,7 @@ class Profile(BaseModel):
     location: str
     bio: str
     profileImage: str
+    profileImageVariants: Optional[dict] = None  # size -> {width, height, webp, jpg} URLs
     linkedin: str
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
     createdAt: datetime = Field(default_factory=datetime.utcnow)
@@ -28,13 +29,16 @@ class ProfileUpdate(BaseModel):
     linkedin: Optional[str] = None
 
 # Contact Models
+# Statuses are also field names in the per-status counters document
+ContactStatus = Literal["new", "read", "replied"]
+
 class Contact(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
     email: EmailStr
     subject: str
     message: str
-    status: str = "new"
+    status: ContactStatus = "new"
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     repliedAt: Optional[datetime] = None
 
@@ -45,9 +49,23 @@ class ContactCreate(BaseModel):
     message: str
 
 class ContactUpdate(BaseModel):
-    status: Optional[str] = None
+    status: Optional[ContactStatus] = None
     repliedAt: Optional[datetime] = None
 
+class ContactFilter(BaseModel):
+    status: Optional[ContactStatus] = None
+    createdFrom: Optional[datetime] = None
+    createdTo: Optional[datetime] = None
+
+class ContactBulkUpdate(BaseModel):
+    ids: Optional[List[str]] = None
+    filter: Optional[ContactFilter] = None
+    update: ContactUpdate
+
+class ContactBulkDelete(BaseModel):
+    ids: Optional[List[str]] = None
+    filter: Optional[ContactFilter] = None
+
 # Blog Models
 class BlogPost(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -61,17 +79,22 @@ class BlogPost(BaseModel):
     image: str
     readTime: str
     published: bool = True
+    views: int = 0
+    plainText: str = ""
+    wordCount: int = 0
+    contentHtml: str = ""
+    contentHash: str = ""
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
 
 class BlogPostCreate(BaseModel):
     title: str
-    excerpt: str
+    excerpt: Optional[str] = None  # generated from content when omitted
     content: str
     category: str
     tags: List[str] = []
     image: str
-    readTime: str
+    readTime: Optional[str] = None  # computed from content when omitted
     published: bool = True
 
 class BlogPostUpdate(BaseModel):
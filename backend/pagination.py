@@ -0,0 +1,56 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+# Sort order shared by every keyset-paginated listing
+KEYSET_SORT = [("createdAt", -1), ("id", -1)]
+
+
+def encode_cursor(payload: dict) -> str:
+    """Encode a cursor payload as an opaque URL-safe token"""
+    raw = json.dumps(payload, separators=(",", ":"), default=_encode_value)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> dict:
+    """Decode a token produced by encode_cursor, raising ValueError if invalid"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, dict):
+            raise ValueError("Cursor payload must be an object")
+        if "createdAt" in payload:
+            payload["createdAt"] = datetime.fromisoformat(payload["createdAt"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return payload
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} in cursor")
+
+
+def keyset_cursor(document: dict) -> str:
+    """Build the cursor pointing just past the given document"""
+    return encode_cursor({"createdAt": document["createdAt"], "id": document["id"]})
+
+
+def keyset_filter(cursor: Optional[dict]) -> dict:
+    """Filter selecting documents that sort after the cursor position"""
+    if not cursor:
+        return {}
+    try:
+        created_at, last_id = cursor["createdAt"], cursor["id"]
+    except KeyError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(created_at, datetime) or not isinstance(last_id, str):
+        raise ValueError("Invalid cursor")
+    return {
+        "$or": [
+            {"createdAt": {"$lt": created_at}},
+            {"createdAt": created_at, "id": {"$lt": last_id}},
+        ]
+    }
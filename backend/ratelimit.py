@@ -0,0 +1,92 @@
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+# Number of reverse proxies in front of the app that append to
+# X-Forwarded-For. Behind an ingress every request arrives from the proxy, so
+# set this to the hop count; with the default of 0 the header is ignored,
+# since any client can send it
+TRUSTED_PROXY_HOPS = int(os.environ.get('RATE_LIMIT_TRUSTED_PROXIES', '0'))
+
+
+class RateLimitBackend(ABC):
+    """Storage for token buckets; swap in a shared store to limit across workers"""
+
+    @abstractmethod
+    async def consume(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> Tuple[bool, float]:
+        """Take cost tokens from key's bucket; return (allowed, seconds until allowed)"""
+
+
+class InMemoryBackend(RateLimitBackend):
+    """Per-process token buckets, least recently used evicted past max_keys"""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def consume(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+
+def client_ip(request: Request) -> str:
+    """Best-effort client address for keying limits.
+
+    Only the entries appended by trusted proxies are used: the right-most
+    TRUSTED_PROXY_HOPS of X-Forwarded-For, of which the left-most is the
+    address the outermost proxy saw. Anything further left is client-supplied.
+    """
+    if TRUSTED_PROXY_HOPS > 0:
+        forwarded = [entry.strip() for entry in request.headers.get("x-forwarded-for", "").split(",") if entry.strip()]
+        if forwarded:
+            return forwarded[-min(TRUSTED_PROXY_HOPS, len(forwarded))]
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimiter:
+    """FastAPI dependency enforcing a token bucket per client IP and route"""
+
+    def __init__(
+        self,
+        name: str,
+        per_minute: float,
+        burst: Optional[float] = None,
+        backend: Optional[RateLimitBackend] = None
+    ):
+        self.name = name
+        self.rate = per_minute / 60.0
+        self.capacity = burst if burst is not None else per_minute
+        self.backend = backend or default_backend
+
+    async def __call__(self, request: Request):
+        allowed, retry_after = await self.backend.consume(
+            f"{self.name}:{client_ip(request)}", self.rate, self.capacity
+        )
+        if not allowed:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests. Please try again later.",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+
+
+default_backend = InMemoryBackend()
+
+contact_rate_limit = RateLimiter("contact", float(os.environ.get('RATE_LIMIT_CONTACT_PER_MINUTE', '5')))
+view_rate_limit = RateLimiter("analytics_view", float(os.environ.get('RATE_LIMIT_VIEWS_PER_MINUTE', '60')))
@@ -0,0 +1,52 @@
+import hashlib
+import os
+
+import markdown
+import nh3
+
+from cache import LRUCache
+
+# Tables, fenced code, footnotes etc. on top of core Markdown
+MARKDOWN_EXTENSIONS = ["extra", "sane_lists"]
+
+# Bumped whenever rendering output changes, so stored renders are redone
+RENDER_VERSION = "2"
+
+# Markdown lets raw HTML through, so rendered bodies are cleaned down to an
+# allowlist: scripts, event handlers and javascript: URLs are stripped, while
+# what the extensions emit (code languages, footnote anchors, table
+# alignment) is kept
+SANITIZE_ATTRIBUTES = {
+    **{tag: set(attributes) for tag, attributes in nh3.ALLOWED_ATTRIBUTES.items()},
+    "th": nh3.ALLOWED_ATTRIBUTES["th"] | {"style"},
+    "td": nh3.ALLOWED_ATTRIBUTES["td"] | {"style"},
+    "*": {"class", "id", "title"},
+}
+
+
+def content_hash(content: str) -> str:
+    """Stable fingerprint of a post body, used as the render cache key"""
+    return hashlib.sha256(f"{RENDER_VERSION}:{content or ''}".encode("utf-8")).hexdigest()
+
+
+def render_markdown(content: str) -> str:
+    """Render a Markdown post body to sanitized HTML"""
+    html = markdown.markdown(content or "", extensions=MARKDOWN_EXTENSIONS, output_format="html")
+    return nh3.clean(
+        html,
+        attributes=SANITIZE_ATTRIBUTES,
+        filter_style_properties={"text-align"},
+    )
+
+
+def rendered_fields(content: str) -> dict:
+    """Rendered HTML and its source hash, stored next to the Markdown on write"""
+    return {
+        "contentHtml": render_markdown(content),
+        "contentHash": content_hash(content),
+    }
+
+
+# Rendered bodies of recently read posts, keyed by contentHash so an edit
+# never serves the old HTML and identical bodies share one entry
+rendered_html_cache = LRUCache(maxsize=int(os.environ.get('RENDER_CACHE_SIZE', '256')))
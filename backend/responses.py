@@ -0,0 +1,56 @@
+import json
+import os
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+from models import APIResponse
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+# Serialize route payloads straight to bytes instead of round-tripping them
+# through the APIResponse model and jsonable_encoder
+FAST_JSON_RESPONSES = os.environ.get('FAST_JSON_RESPONSES', 'false').lower() == 'true'
+
+
+def render_json(content) -> bytes:
+    """Serialize content exactly as FastAPI would for a route's return value"""
+    return JSONResponse(content=jsonable_encoder(content)).body
+
+
+def _default(value):
+    # Same representation jsonable_encoder gives these types
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dump_json(content) -> bytes:
+    """Serialize plain dicts/lists of Mongo documents to compact JSON bytes"""
+    if orjson is not None:
+        # orjson formats naive datetimes like datetime.isoformat()
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_bytes_response(body: bytes, status_code: int = 200, headers: dict = None) -> Response:
+    """Wrap already-serialized JSON in a response"""
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
+
+
+def api_response(message: str, data: Optional[dict] = None, headers: dict = None, success: bool = True) -> Response:
+    """Serialized APIResponse envelope around raw documents.
+
+    With FAST_JSON_RESPONSES on, the envelope is encoded directly; otherwise
+    it goes through the model; both produce the same JSON document.
+    """
+    if FAST_JSON_RESPONSES:
+        body = dump_json({"success": success, "message": message, "data": data})
+    else:
+        body = render_json(APIResponse(success=success, message=message, data=data))
+    return json_bytes_response(body, headers=headers)
@@ -0,0 +1,122 @@
+from fastapi import APIRouter, HTTPException, Query
+from models import APIResponse
+from database import db, mongo_options, pool_monitor, slow_query_recorder
+from indexes import check_query_plans
+from jobs import job_queue
+from routes.profile import profile_cache
+from routes.contact import contact_dedup, reconcile_status_counts
+from rendering import rendered_html_cache
+from compression import response_variants, supported_encodings
+import logging
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+logger = logging.getLogger(__name__)
+
+@router.get("/cache")
+async def get_cache_stats():
+    """Get hit/miss statistics for the in-process caches"""
+    try:
+        return APIResponse(
+            success=True,
+            message="Cache statistics retrieved successfully",
+            data={
+                "profile": profile_cache.stats(),
+                "contactDedup": contact_dedup.stats(),
+                "renderedHtml": rendered_html_cache.stats(),
+                "compressedResponses": {**response_variants.stats(), "encodings": supported_encodings()},
+            }
+        )
+    
+    except Exception as e:
+        logger.error(f"Error retrieving cache statistics: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/indexes")
+async def get_index_report():
+    """Explain the routes' queries and report any collection scans"""
+    try:
+        report = await check_query_plans(db)
+        collscans = [entry["route"] for entry in report if entry.get("collscan")]
+        
+        return APIResponse(
+            success=True,
+            message="Query plan check completed",
+            data={"queries": report, "collscans": collscans}
+        )
+    
+    except Exception as e:
+        logger.error(f"Error checking query plans: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/pool")
+async def get_pool_stats():
+    """Get MongoDB connection pool statistics and settings"""
+    try:
+        return APIResponse(
+            success=True,
+            message="Pool statistics retrieved successfully",
+            data={"stats": pool_monitor.stats(), "options": mongo_options}
+        )
+    
+    except Exception as e:
+        logger.error(f"Error retrieving pool statistics: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/jobs")
+async def get_job_stats():
+    """Get background job queue statistics and recent dead letters"""
+    try:
+        return APIResponse(
+            success=True,
+            message="Job queue statistics retrieved successfully",
+            data={"stats": job_queue.stats(), "deadLetters": list(job_queue.dead_letters)}
+        )
+    
+    except Exception as e:
+        logger.error(f"Error retrieving job statistics: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/contact-counts/reconcile")
+async def reconcile_contact_counts():
+    """Recount contacts per status and overwrite the inbox counters"""
+    try:
+        counts = await reconcile_status_counts()
+        return APIResponse(
+            success=True,
+            message="Contact status counts reconciled",
+            data={"counts": counts}
+        )
+    
+    except Exception as e:
+        logger.error(f"Error reconciling contact status counts: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=1000, description="Number of most recent slow queries to return")
+):
+    """Get recent Mongo commands slower than SLOW_QUERY_MS, with captured query plans"""
+    try:
+        return APIResponse(
+            success=True,
+            message="Slow queries retrieved successfully",
+            data=slow_query_recorder.snapshot(limit)
+        )
+    
+    except Exception as e:
+        logger.error(f"Error retrieving slow queries: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.delete("/slow-queries")
+async def clear_slow_queries():
+    """Clear recorded slow queries and plans"""
+    try:
+        slow_query_recorder.clear()
+        return APIResponse(
+            success=True,
+            message="Slow queries cleared successfully"
+        )
+    
+    except Exception as e:
+        logger.error(f"Error clearing slow queries: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
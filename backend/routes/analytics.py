@@ -1,7 +1,10 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from models import Analytics, AnalyticsUpdate, APIResponse
-from database import analytics_collection
-from datetime import datetime
+from database import analytics_collection, analytics_series_collection, to_naive_utc
+from ratelimit import view_rate_limit
+from counters import analytics_counters, ANALYTICS_DEFAULTS, truncate_bucket
+from datetime import datetime, timedelta
+from typing import Optional
 import logging
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
@@ -14,20 +17,17 @@ async def get_analytics():
         analytics_doc = await analytics_collection.find_one()
         if not analytics_doc:
             # Create default analytics if none exist
-            default_analytics = {
-                "id": "current",
-                "websiteViews": 0,
-                "blogViews": 0,
-                "contactInquiries": 0,
-                "socialMediaFollowers": 456,
-                "date": datetime.utcnow()
-            }
+            default_analytics = {**ANALYTICS_DEFAULTS, "date": datetime.utcnow()}
             await analytics_collection.insert_one(default_analytics)
             analytics_doc = default_analytics
         
         # Remove MongoDB _id field
         analytics_doc.pop('_id', None)
         
+        # Include increments that are still buffered in memory
+        for field, amount in analytics_counters.pending().items():
+            analytics_doc[field] = analytics_doc.get(field, 0) + amount
+        
         return APIResponse(
             success=True,
             message="Analytics retrieved successfully",
@@ -38,7 +38,59 @@ async def get_analytics():
         logger.error(f"Error retrieving analytics: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@router.post("/view")
+# Bucket width and default range for each series granularity
+SERIES_STEPS = {
+    "minute": (timedelta(minutes=1), timedelta(hours=1)),
+    "hour": (timedelta(hours=1), timedelta(days=1)),
+    "day": (timedelta(days=1), timedelta(days=30)),
+}
+MAX_SERIES_POINTS = 2000
+
+@router.get("/series")
+async def get_analytics_series(
+    start: Optional[datetime] = Query(None, alias="from", description="Range start (inclusive)"),
+    end: Optional[datetime] = Query(None, alias="to", description="Range end (exclusive)"),
+    granularity: str = Query("hour", pattern="^(minute|hour|day)$", description="Bucket size")
+):
+    """Get view counts per time bucket"""
+    try:
+        step, default_span = SERIES_STEPS[granularity]
+        end = to_naive_utc(end) if end else datetime.utcnow()
+        start = to_naive_utc(start) if start else end - default_span
+        
+        first_bucket = truncate_bucket(start, granularity)
+        if end <= first_bucket:
+            raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+        if (end - first_bucket) / step > MAX_SERIES_POINTS:
+            raise HTTPException(status_code=400, detail=f"Range exceeds {MAX_SERIES_POINTS} {granularity} buckets")
+        
+        # Buckets are pre-aggregated on write, so this is a plain range read
+        buckets = await analytics_series_collection.find(
+            {"granularity": granularity, "bucket": {"$gte": first_bucket, "$lt": end}},
+            {"_id": 0, "bucket": 1, "counts": 1}
+        ).sort("bucket", 1).to_list(MAX_SERIES_POINTS)
+        counts_by_bucket = {bucket["bucket"]: bucket.get("counts", {}) for bucket in buckets}
+        
+        # Fill empty buckets so the series is contiguous
+        points = []
+        bucket = first_bucket
+        while bucket < end:
+            points.append({"bucket": bucket, "counts": counts_by_bucket.get(bucket, {})})
+            bucket += step
+        
+        return APIResponse(
+            success=True,
+            message="Analytics series retrieved successfully",
+            data={"granularity": granularity, "from": first_bucket, "to": end, "points": points}
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving analytics series: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/view", dependencies=[Depends(view_rate_limit)])
 async def track_view(view_type: str = "website"):
     """Track a page view"""
     try:
@@ -49,23 +101,8 @@ async def track_view(view_type: str = "website"):
         
         field_to_increment = field_map.get(view_type, "websiteViews")
         
-        # Increment the appropriate view counter
-        result = await analytics_collection.update_one(
-            {},
-            {"$inc": {field_to_increment: 1}}
-        )
-        
-        if result.matched_count == 0:
-            # Create analytics document if it doesn't exist
-            new_analytics = {
-                "id": "current",
-                "websiteViews": 1 if view_type == "website" else 0,
-                "blogViews": 1 if view_type == "blog" else 0,
-                "contactInquiries": 0,
-                "socialMediaFollowers": 456,
-                "date": datetime.utcnow()
-            }
-            await analytics_collection.insert_one(new_analytics)
+        # Buffer the increment; it is written on the next counter flush
+        analytics_counters.incr(field_to_increment)
         
         return APIResponse(
             success=True,
@@ -82,6 +119,9 @@ async def update_analytics(analytics_update: AnalyticsUpdate):
     try:
         update_data = analytics_update.dict(exclude_unset=True)
         
+        # Write buffered increments first so they apply before the manual values
+        await analytics_counters.flush()
+        
         result = await analytics_collection.update_one(
             {},
             {"$set": update_data}
@@ -95,6 +135,8 @@ async def update_analytics(analytics_update: AnalyticsUpdate):
             message="Analytics updated successfully"
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error updating analytics: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
@@ -1,6 +1,16 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from models import BlogPost, BlogPostCreate, BlogPostUpdate, APIResponse
-from database import blog_collection, analytics_collection
+from database import blog_collection
+from counters import analytics_counters
+from trending import trending_posts
+from search_index import blog_search_index
+from etags import collection_versions, make_etag, is_not_modified, not_modified_response, validator_headers
+from content_stats import content_fields, make_excerpt
+from rendering import rendered_fields, render_markdown, rendered_html_cache
+from responses import api_response
+from pagination import KEYSET_SORT, decode_cursor, encode_cursor, keyset_cursor, keyset_filter
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
 from typing import List, Optional
 import logging
@@ -16,63 +26,224 @@ def create_slug(title: str) -> str:
     slug = re.sub(r'[-\s]+', '-', slug)
     return slug.strip('-')
 
+def track_post_view(slug: str):
+    """Count a read of a blog post"""
+    analytics_counters.incr("blogViews")
+    analytics_counters.incr_post_view(slug)
+    trending_posts.hit(slug)
+
+# Retries when a concurrent write claims the allocated slug first
+SLUG_ALLOCATION_ATTEMPTS = 5
+
+async def allocate_slug(base_slug: str, exclude_id: Optional[str] = None) -> str:
+    """Return base_slug, or base_slug-N with the lowest free N, in one query"""
+    # Anchored on the base slug, so the slug index bounds the scan
+    query = {"slug": {"$regex": f"^{re.escape(base_slug)}(-[0-9]+)?$"}}
+    if exclude_id:
+        query["id"] = {"$ne": exclude_id}
+    
+    taken = {post["slug"] for post in await blog_collection.find(query, {"_id": 0, "slug": 1}).to_list(None)}
+    if base_slug not in taken:
+        return base_slug
+    
+    counter = 1
+    while f"{base_slug}-{counter}" in taken:
+        counter += 1
+    return f"{base_slug}-{counter}"
+
+async def dedupe_slugs() -> int:
+    """Re-suffix posts sharing a slug so the unique slug index can be built.
+
+    Earlier versions of the update route rewrote slugs without checking for
+    collisions. The oldest post keeps each slug; the others move to the next
+    free suffix. Returns how many posts were renamed.
+    """
+    duplicates = blog_collection.aggregate([
+        {"$group": {"_id": "$slug", "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ])
+    renamed = 0
+    async for group in duplicates:
+        slug = group["_id"]
+        posts = await blog_collection.find({"slug": slug}, {"_id": 0, "id": 1}).sort([("createdAt", 1), ("id", 1)]).to_list(None)
+        for post in posts[1:]:
+            new_slug = await allocate_slug(slug, exclude_id=post["id"])
+            await blog_collection.update_one({"id": post["id"]}, {"$set": {"slug": new_slug}})
+            logger.warning(f"Blog post {post['id']} renamed from duplicate slug '{slug}' to '{new_slug}'")
+            renamed += 1
+    return renamed
+
+# plainText is derived for search and excerpts and never sent to clients;
+# contentHtml is only sent with a single post, usually from the render cache;
+# list views only render the post summary, so they also skip content
+POST_PROJECTION = {"_id": 0, "plainText": 0, "contentHtml": 0}
+LIST_VIEW_PROJECTION = {"_id": 0, "plainText": 0, "contentHtml": 0, "content": 0}
+
+def derive_content_fields(post_data: dict, partial: bool = False) -> dict:
+    """Fill in reading stats and excerpt computed from content.
+
+    Explicitly supplied readTime/excerpt values win. On a partial update the
+    stored excerpt is only replaced when the client sends an empty one.
+    """
+    derived = content_fields(post_data["content"])
+    if post_data.get("readTime"):
+        derived.pop("readTime")
+    if not post_data.get("excerpt") and (not partial or "excerpt" in post_data):
+        derived["excerpt"] = make_excerpt(derived["plainText"])
+    derived.update(rendered_fields(post_data["content"]))
+    post_data.update(derived)
+    return post_data
+
+async def rendered_html(post: dict) -> str:
+    """Rendered body of a post, from the LRU cache or the stored render"""
+    key = post.get("contentHash")
+    html = rendered_html_cache.get(key) if key else None
+    if html is None:
+        stored = None
+        if key:
+            # Matching on the hash skips a render stored by a newer edit
+            stored = await blog_collection.find_one({"id": post["id"], "contentHash": key}, {"_id": 0, "contentHtml": 1})
+        html = stored.get("contentHtml") if stored else None
+        if html is None:
+            html = render_markdown(post.get("content", ""))
+        if key:
+            rendered_html_cache.set(key, html)
+    return html
+
 @router.get("/")
 async def get_blog_posts(
+    request: Request,
     category: Optional[str] = Query(None, description="Filter by category"),
     search: Optional[str] = Query(None, description="Search in title and excerpt"),
-    published: bool = Query(True, description="Filter by published status")
+    published: bool = Query(True, description="Filter by published status"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page"),
+    limit: int = Query(50, ge=1, le=100, description="Page size"),
+    view: str = Query("full", pattern="^(full|list)$", description="'list' leaves out post content")
 ):
-    """Get all blog posts with optional filtering"""
+    """Get blog posts with optional filtering and cursor pagination"""
     try:
+        # Answer revalidations from the collection version without querying Mongo
+        etag = make_etag("blog_posts", collection_versions.token("blog_posts"), request.url.query)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+        
         # Build filter query
         filter_query = {"published": published}
+        projection = LIST_VIEW_PROJECTION if view == "list" else POST_PROJECTION
         
         if category and category != "all":
             filter_query["category"] = category
         
-        if search:
-            filter_query["$or"] = [
-                {"title": {"$regex": search, "$options": "i"}},
-                {"excerpt": {"$regex": search, "$options": "i"}},
-                {"content": {"$regex": search, "$options": "i"}}
-            ]
+        try:
+            page_cursor = decode_cursor(cursor) if cursor else None
+            keyset_query = keyset_filter(page_cursor) if not search else {}
+            # Search pages are positions in the ranking rather than keysets
+            offset = page_cursor.get("offset", 0) if search and page_cursor else 0
+            if type(offset) is not int or offset < 0:
+                raise ValueError("Invalid cursor offset")
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
         
-        # Get blog posts
-        posts = await blog_collection.find(filter_query).sort("createdAt", -1).to_list(50)
+        if search:
+            # Rank matches with the in-memory index, then fetch only one page of them
+            post_ids = blog_search_index.search(
+                search,
+                published=published,
+                category=filter_query.get("category"),
+                limit=offset + limit + 1
+            )[offset:]
+            has_more = len(post_ids) > limit
+            post_ids = post_ids[:limit]
+            
+            filter_query["id"] = {"$in": post_ids}
+            posts = await blog_collection.find(filter_query, projection).to_list(len(post_ids))
+            rank = {post_id: position for position, post_id in enumerate(post_ids)}
+            posts.sort(key=lambda post: rank.get(post.get("id"), len(rank)))
+            next_cursor = encode_cursor({"offset": offset + limit}) if has_more else None
+        else:
+            # Keyset pagination on (createdAt, id) keeps deep pages as cheap as the first
+            filter_query.update(keyset_query)
+            posts = await blog_collection.find(filter_query, projection).sort(KEYSET_SORT).to_list(limit + 1)
+            has_more = len(posts) > limit
+            posts = posts[:limit]
+            next_cursor = keyset_cursor(posts[-1]) if has_more else None
         
-        # Remove MongoDB _id field
         for post in posts:
-            post.pop('_id', None)
             # Format dates for frontend
             if isinstance(post.get('createdAt'), datetime):
                 post['date'] = post['createdAt'].strftime('%Y-%m-%d')
         
+        # Documents are already plain dicts, so skip the model round trip
+        return api_response(
+            "Blog posts retrieved successfully",
+            {"posts": posts, "total": len(posts), "nextCursor": next_cursor},
+            headers=validator_headers(etag)
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving blog posts: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/trending")
+async def get_trending_posts(
+    limit: int = Query(5, ge=1, le=20, description="Number of posts to return")
+):
+    """Get the most viewed posts, weighted towards recent views"""
+    try:
+        # Over-fetch a little in case some tracked posts were unpublished or deleted
+        ranked = trending_posts.top(limit * 2)
+        scores = dict(ranked)
+        
+        posts = await blog_collection.find(
+            {"slug": {"$in": list(scores)}, "published": True},
+            LIST_VIEW_PROJECTION
+        ).to_list(len(scores))
+        posts.sort(key=lambda post: scores[post["slug"]], reverse=True)
+        posts = posts[:limit]
+        
+        for post in posts:
+            post["trendingScore"] = round(scores[post["slug"]], 3)
+            if isinstance(post.get('createdAt'), datetime):
+                post['date'] = post['createdAt'].strftime('%Y-%m-%d')
+        
         return APIResponse(
             success=True,
-            message="Blog posts retrieved successfully",
+            message="Trending posts retrieved successfully",
             data={"posts": posts, "total": len(posts)}
         )
     
     except Exception as e:
-        logger.error(f"Error retrieving blog posts: {e}")
+        logger.error(f"Error retrieving trending posts: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/{slug}")
-async def get_blog_post(slug: str):
+async def get_blog_post(slug: str, request: Request, response: Response):
     """Get specific blog post by slug"""
     try:
-        post = await blog_collection.find_one({"slug": slug, "published": True})
+        etag = make_etag("blog_post", collection_versions.token("blog_posts"), slug)
+        # Only answer from the validator for slugs known to be published posts;
+        # anything else (including If-None-Match: *) has to be found in Mongo
+        # first, so unknown slugs never count as views
+        if blog_search_index.has_published_slug(slug) and is_not_modified(request, etag):
+            # The reader still viewed the post, just from their cache
+            track_post_view(slug)
+            return not_modified_response(etag)
+        
+        post = await blog_collection.find_one({"slug": slug, "published": True}, POST_PROJECTION)
         
         if not post:
             raise HTTPException(status_code=404, detail="Blog post not found")
         
-        post.pop('_id', None)
+        if is_not_modified(request, etag):
+            track_post_view(slug)
+            return not_modified_response(etag)
         
-        # Track blog view
-        await analytics_collection.update_one(
-            {},
-            {"$inc": {"blogViews": 1}}
-        )
+        post.pop('_id', None)
+        post["contentHtml"] = await rendered_html(post)
+        track_post_view(slug)
+        response.headers.update(validator_headers(etag, post.get("updatedAt")))
         
         return APIResponse(
             success=True,
@@ -80,6 +251,8 @@ async def get_blog_post(slug: str):
             data=post
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving blog post: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -89,38 +262,35 @@ async def create_blog_post(post_data: BlogPostCreate):
     """Create new blog post"""
     try:
         # Create slug from title
-        slug = create_slug(post_data.title)
-        
-        # Check if slug already exists
-        existing_post = await blog_collection.find_one({"slug": slug})
-        if existing_post:
-            # Make slug unique by appending number
-            counter = 1
-            while existing_post:
-                new_slug = f"{slug}-{counter}"
-                existing_post = await blog_collection.find_one({"slug": new_slug})
-                if not existing_post:
-                    slug = new_slug
-                    break
-                counter += 1
-        
-        # Create blog post
-        post_dict = post_data.dict()
-        post_dict["slug"] = slug
-        post_obj = BlogPost(**post_dict)
-        
-        # Insert into database
-        result = await blog_collection.insert_one(post_obj.dict())
+        base_slug = create_slug(post_data.title)
+        post_dict = derive_content_fields(post_data.dict())
+        
+        # The unique slug index rejects a slug claimed by a concurrent create
+        # between allocation and insert; allocate again in that case
+        for _ in range(SLUG_ALLOCATION_ATTEMPTS):
+            post_dict["slug"] = await allocate_slug(base_slug)
+            post_obj = BlogPost(**post_dict)
+            try:
+                result = await blog_collection.insert_one(post_obj.dict())
+                break
+            except DuplicateKeyError:
+                continue
+        else:
+            raise HTTPException(status_code=409, detail="Could not allocate a unique slug")
         
         if result.inserted_id:
+            blog_search_index.add(post_obj.dict())
+            collection_versions.bump("blog_posts")
             return APIResponse(
                 success=True,
                 message="Blog post created successfully",
-                data={"slug": slug, "id": post_obj.id}
+                data={"slug": post_obj.slug, "id": post_obj.id}
             )
         else:
             raise HTTPException(status_code=500, detail="Failed to create blog post")
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error creating blog post: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -132,23 +302,46 @@ async def update_blog_post(post_id: str, post_update: BlogPostUpdate):
         update_data = post_update.dict(exclude_unset=True)
         update_data["updatedAt"] = datetime.utcnow()
         
-        # If title is being updated, update slug too
-        if "title" in update_data:
-            update_data["slug"] = create_slug(update_data["title"])
+        if update_data.get("content") is not None:
+            derive_content_fields(update_data, partial=True)
+        else:
+            # Without new content there is nothing to derive an empty value from
+            for field in ("content", "excerpt", "readTime"):
+                if not update_data.get(field, True):
+                    update_data.pop(field)
         
-        result = await blog_collection.update_one(
-            {"id": post_id},
-            {"$set": update_data}
-        )
+        for _ in range(SLUG_ALLOCATION_ATTEMPTS):
+            # If title is being updated, update slug too
+            if "title" in update_data:
+                update_data["slug"] = await allocate_slug(create_slug(update_data["title"]), exclude_id=post_id)
+            try:
+                updated_post = await blog_collection.find_one_and_update(
+                    {"id": post_id},
+                    {"$set": update_data},
+                    return_document=ReturnDocument.AFTER
+                )
+                break
+            except DuplicateKeyError:
+                if "title" not in update_data:
+                    raise
+        else:
+            raise HTTPException(status_code=409, detail="Could not allocate a unique slug")
         
-        if result.matched_count == 0:
+        if updated_post is None:
             raise HTTPException(status_code=404, detail="Blog post not found")
         
+        collection_versions.bump("blog_posts")
+        
+        # Re-index the stored version of the post
+        blog_search_index.add(updated_post)
+        
         return APIResponse(
             success=True,
             message="Blog post updated successfully"
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error updating blog post: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -162,11 +355,16 @@ async def delete_blog_post(post_id: str):
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Blog post not found")
         
+        blog_search_index.remove(post_id)
+        collection_versions.bump("blog_posts")
+        
         return APIResponse(
             success=True,
             message="Blog post deleted successfully"
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error deleting blog post: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
@@ -1,17 +1,114 @@
-from fastapi import APIRouter, HTTPException
-from models import Contact, ContactCreate, ContactUpdate, ContactResponse, APIResponse
-from database import contacts_collection, analytics_collection
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from models import (
+    Contact, ContactCreate, ContactUpdate, ContactResponse, APIResponse,
+    ContactBulkUpdate, ContactBulkDelete, ContactStatus
+)
+from database import contacts_collection, counters_collection, to_naive_utc
+from counters import analytics_counters, contact_status_counters
+from pagination import KEYSET_SORT, decode_cursor, keyset_cursor, keyset_filter
+from jobs import job_queue
+from cache import TTLCache
+from ratelimit import contact_rate_limit
+from pymongo import ReturnDocument
 from datetime import datetime
-from typing import List
+from typing import List, Optional, get_args
+import csv
+import hashlib
+import io
+import json
 import logging
+import os
 
 router = APIRouter(prefix="/api/contact", tags=["contact"])
 logger = logging.getLogger(__name__)
 
-@router.post("/", response_model=ContactResponse)
+# Recently accepted submissions by content hash; a repeat inside the window
+# gets the original response back instead of writing a duplicate
+contact_dedup = TTLCache(ttl=float(os.environ.get('CONTACT_DEDUP_SECONDS', '600')), maxsize=10000)
+
+def submission_fingerprint(contact_data: ContactCreate) -> str:
+    """Hash identifying repeated submissions of the same message"""
+    parts = [contact_data.email.lower(), contact_data.subject.strip(), contact_data.message.strip()]
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+# Statuses always present in the inbox count summary
+CONTACT_STATUSES = list(get_args(ContactStatus))
+
+# Largest id list accepted by the bulk endpoints
+MAX_BULK_IDS = 1000
+
+# Columns written by the CSV export, in order
+EXPORT_FIELDS = ["id", "name", "email", "subject", "message", "status", "createdAt", "repliedAt"]
+# Documents fetched per cursor batch and written per streamed chunk
+EXPORT_BATCH_SIZE = 500
+
+def contact_filter(
+    status: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> dict:
+    """Build a contacts query from status and createdAt range filters"""
+    query = {}
+    if status:
+        query["status"] = status
+    if start or end:
+        query["createdAt"] = {}
+        if start:
+            query["createdAt"]["$gte"] = to_naive_utc(start)
+        if end:
+            query["createdAt"]["$lt"] = to_naive_utc(end)
+    return query
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _ndjson_line(contact: dict) -> str:
+    return json.dumps(contact, default=_export_value, ensure_ascii=False) + "\n"
+
+def _csv_line(contact: dict) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(
+        ["" if contact.get(field) is None else _export_value(contact.get(field)) for field in EXPORT_FIELDS]
+    )
+    return buffer.getvalue()
+
+async def stream_contacts(query: dict, export_format: str):
+    """Yield the export in chunks straight off the Motor cursor"""
+    format_line = _csv_line if export_format == "csv" else _ndjson_line
+    if export_format == "csv":
+        yield ",".join(EXPORT_FIELDS) + "\r\n"
+    
+    cursor = contacts_collection.find(query, {"_id": 0}).sort(KEYSET_SORT).batch_size(EXPORT_BATCH_SIZE)
+    chunk = []
+    async for contact in cursor:
+        chunk.append(format_line(contact))
+        if len(chunk) >= EXPORT_BATCH_SIZE:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+# Not persisted: the handler only buffers counter increments, which a
+# crash loses anyway, and replaying it from the outbox would double-count
+@job_queue.handler("contact.submitted", persist=False)
+async def process_contact_submission(payload: dict):
+    """Post-process a stored contact submission off the request path"""
+    # Update analytics - increment contact inquiries
+    analytics_counters.incr("contactInquiries")
+    contact_status_counters.incr(payload["status"])
+
+@router.post("/", response_model=ContactResponse, dependencies=[Depends(contact_rate_limit)])
 async def submit_contact(contact_data: ContactCreate):
     """Submit contact form"""
     try:
+        fingerprint = submission_fingerprint(contact_data)
+        duplicate = contact_dedup.get(fingerprint)
+        if duplicate is not None:
+            return duplicate
+        
         # Create contact document
         contact_dict = contact_data.dict()
         contact_obj = Contact(**contact_dict)
@@ -20,63 +117,259 @@ async def submit_contact(contact_data: ContactCreate):
         result = await contacts_collection.insert_one(contact_obj.dict())
         
         if result.inserted_id:
-            # Update analytics - increment contact inquiries
-            await analytics_collection.update_one(
-                {},
-                {"$inc": {"contactInquiries": 1}}
-            )
+            # Everything after the insert runs on the job queue workers
+            await job_queue.enqueue("contact.submitted", {"contactId": contact_obj.id, "status": contact_obj.status})
             
-            return ContactResponse(
+            response = ContactResponse(
                 success=True,
                 message="Thank you for reaching out! I'll get back to you within 24 hours.",
                 contact=contact_obj
             )
+            contact_dedup.set(fingerprint, response)
+            return response
         else:
             raise HTTPException(status_code=500, detail="Failed to submit contact form")
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error submitting contact form: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+async def get_status_counts() -> dict:
+    """Per-status contact totals from the counters document plus buffered changes"""
+    counts_doc = await counters_collection.find_one({"id": "contact_status"}, {"_id": 0, "id": 0, "date": 0}) or {}
+    for status, amount in contact_status_counters.pending().items():
+        counts_doc[status] = counts_doc.get(status, 0) + amount
+    for status in CONTACT_STATUSES:
+        counts_doc.setdefault(status, 0)
+    return counts_doc
+
+async def reconcile_status_counts() -> dict:
+    """Recount contacts per status and overwrite the counters document.
+
+    The document is kept current incrementally, so anything that skips an
+    increment (a lost job, a crash before a flush, bulk updates racing each
+    other) leaves it wrong for good; this puts it back in line. Buffered
+    changes are flushed first so they aren't applied twice.
+    """
+    await contact_status_counters.flush()
+    counts = {status: 0 for status in CONTACT_STATUSES}
+    async for group in contacts_collection.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+        if group["_id"] in counts:
+            counts[group["_id"]] = group["count"]
+    await counters_collection.replace_one(
+        {"id": "contact_status"},
+        {"id": "contact_status", "date": datetime.utcnow(), **counts},
+        upsert=True
+    )
+    return counts
+
 @router.get("/")
-async def get_contacts():
-    """Get all contact submissions (admin only)"""
+async def get_contacts(
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page"),
+    limit: int = Query(100, ge=1, le=500, description="Page size"),
+    status: Optional[str] = Query(None, description="Filter by status (new/read/replied)"),
+    start: Optional[datetime] = Query(None, alias="from", description="Submitted at or after"),
+    end: Optional[datetime] = Query(None, alias="to", description="Submitted before")
+):
+    """Get contact submissions, newest first, one page at a time (admin only)"""
     try:
-        contacts = await contacts_collection.find().sort("createdAt", -1).to_list(100)
+        query = contact_filter(status, start, end)
+        try:
+            query.update(keyset_filter(decode_cursor(cursor) if cursor else None))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
         
-        # Remove MongoDB _id field
-        for contact in contacts:
-            contact.pop('_id', None)
+        contacts = await contacts_collection.find(query, {"_id": 0}).sort(KEYSET_SORT).to_list(limit + 1)
+        has_more = len(contacts) > limit
+        contacts = contacts[:limit]
         
         return APIResponse(
             success=True,
             message="Contacts retrieved successfully",
-            data={"contacts": contacts, "total": len(contacts)}
+            data={
+                "contacts": contacts,
+                "total": len(contacts),
+                "nextCursor": keyset_cursor(contacts[-1]) if has_more else None,
+                "counts": await get_status_counts()
+            }
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving contacts: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.get("/export")
+async def export_contacts(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    status: Optional[str] = Query(None, description="Filter by status (new/read/replied)"),
+    start: Optional[datetime] = Query(None, alias="from", description="Submitted at or after"),
+    end: Optional[datetime] = Query(None, alias="to", description="Submitted before")
+):
+    """Stream contact submissions as NDJSON or CSV (admin only)"""
+    try:
+        query = contact_filter(status, start, end)
+        media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+        filename = f"contacts-{datetime.utcnow().strftime('%Y%m%d')}.{export_format}"
+        
+        return StreamingResponse(
+            stream_contacts(query, export_format),
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+    
+    except Exception as e:
+        logger.error(f"Error exporting contacts: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+def bulk_target(ids: Optional[List[str]], contact_filter_model) -> dict:
+    """Resolve a bulk request's id list or filter into a contacts query"""
+    if bool(ids) == bool(contact_filter_model):
+        raise HTTPException(status_code=400, detail="Provide either 'ids' or 'filter'")
+    if ids:
+        if len(ids) > MAX_BULK_IDS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_IDS} ids per request")
+        return {"id": {"$in": list(dict.fromkeys(ids))}}
+    
+    query = contact_filter(
+        contact_filter_model.status,
+        contact_filter_model.createdFrom,
+        contact_filter_model.createdTo
+    )
+    if not query:
+        # Refuse to touch the whole collection through an empty filter
+        raise HTTPException(status_code=400, detail="Filter must set status or a date range")
+    return query
+
+async def matched_statuses(query: dict, ids: Optional[List[str]]):
+    """Return (status per matched id, count per status) for a bulk target"""
+    if ids:
+        found = await contacts_collection.find(query, {"_id": 0, "id": 1, "status": 1}).to_list(None)
+        by_id = {contact["id"]: contact.get("status") for contact in found}
+        status_counts = {}
+        for status in by_id.values():
+            status_counts[status] = status_counts.get(status, 0) + 1
+        return by_id, status_counts
+    
+    status_counts = {}
+    async for group in contacts_collection.aggregate([
+        {"$match": query},
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+    ]):
+        status_counts[group["_id"]] = group["count"]
+    return None, status_counts
+
+@router.patch("/bulk")
+async def bulk_update_contacts(bulk_update: ContactBulkUpdate):
+    """Update many contacts in one request (admin only)"""
+    try:
+        query = bulk_target(bulk_update.ids, bulk_update.filter)
+        update_data = bulk_update.update.dict(exclude_unset=True)
+        if not update_data:
+            raise HTTPException(status_code=400, detail="Nothing to update")
+        
+        by_id, status_counts = await matched_statuses(query, bulk_update.ids)
+        if by_id is not None:
+            # Only touch the ids that exist so per-item results stay accurate
+            query = {"id": {"$in": list(by_id)}}
+        
+        result = await contacts_collection.update_many(query, {"$set": update_data})
+        
+        new_status = update_data.get("status")
+        if new_status:
+            for status, count in status_counts.items():
+                if status != new_status:
+                    if status:
+                        contact_status_counters.incr(status, -count)
+                    contact_status_counters.incr(new_status, count)
+        
+        data = {"matched": result.matched_count, "modified": result.modified_count}
+        if by_id is not None:
+            data["results"] = [
+                {"id": contact_id, "result": "updated" if contact_id in by_id else "not_found"}
+                for contact_id in dict.fromkeys(bulk_update.ids)
+            ]
+        
+        return APIResponse(
+            success=True,
+            message=f"{result.matched_count} contacts updated successfully",
+            data=data
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error bulk updating contacts: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.delete("/bulk")
+async def bulk_delete_contacts(bulk_delete: ContactBulkDelete):
+    """Delete many contacts in one request (admin only)"""
+    try:
+        query = bulk_target(bulk_delete.ids, bulk_delete.filter)
+        
+        by_id, status_counts = await matched_statuses(query, bulk_delete.ids)
+        if by_id is not None:
+            query = {"id": {"$in": list(by_id)}}
+        
+        result = await contacts_collection.delete_many(query)
+        
+        for status, count in status_counts.items():
+            if status:
+                contact_status_counters.incr(status, -count)
+        
+        data = {"deleted": result.deleted_count}
+        if by_id is not None:
+            data["results"] = [
+                {"id": contact_id, "result": "deleted" if contact_id in by_id else "not_found"}
+                for contact_id in dict.fromkeys(bulk_delete.ids)
+            ]
+        
+        return APIResponse(
+            success=True,
+            message=f"{result.deleted_count} contacts deleted successfully",
+            data=data
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error bulk deleting contacts: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @router.put("/{contact_id}")
 async def update_contact(contact_id: str, contact_update: ContactUpdate):
     """Update contact status"""
     try:
         update_data = contact_update.dict(exclude_unset=True)
         
-        result = await contacts_collection.update_one(
+        # The previous status is needed to move the per-status counts
+        previous = await contacts_collection.find_one_and_update(
             {"id": contact_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            projection={"_id": 0, "status": 1},
+            return_document=ReturnDocument.BEFORE
         )
         
-        if result.matched_count == 0:
+        if previous is None:
             raise HTTPException(status_code=404, detail="Contact not found")
         
+        new_status = update_data.get("status")
+        if new_status and new_status != previous.get("status"):
+            if previous.get("status"):
+                contact_status_counters.incr(previous["status"], -1)
+            contact_status_counters.incr(new_status)
+        
         return APIResponse(
             success=True,
             message="Contact updated successfully"
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error updating contact: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -85,16 +378,24 @@ async def update_contact(contact_id: str, contact_update: ContactUpdate):
 async def delete_contact(contact_id: str):
     """Delete contact submission"""
     try:
-        result = await contacts_collection.delete_one({"id": contact_id})
+        deleted = await contacts_collection.find_one_and_delete(
+            {"id": contact_id},
+            projection={"_id": 0, "status": 1}
+        )
         
-        if result.deleted_count == 0:
+        if deleted is None:
             raise HTTPException(status_code=404, detail="Contact not found")
         
+        if deleted.get("status"):
+            contact_status_counters.incr(deleted["status"], -1)
+        
         return APIResponse(
             success=True,
             message="Contact deleted successfully"
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error deleting contact: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from health import readiness
+import logging
+
+router = APIRouter(prefix="/api/health", tags=["health"])
+logger = logging.getLogger(__name__)
+
+# Probe results must never be served from a cache
+NO_STORE = {"Cache-Control": "no-store"}
+
+@router.get("/live")
+async def liveness():
+    """Liveness probe: the process is up and its event loop is serving requests"""
+    return JSONResponse({"status": "alive", "uptime": readiness.uptime()}, headers=NO_STORE)
+
+@router.get("/ready")
+async def readiness_probe():
+    """Readiness probe: startup finished, Mongo answers and the worker isn't saturated"""
+    try:
+        result = await readiness.result()
+    except Exception as e:
+        logger.error(f"Error running readiness checks: {e}")
+        result = {"status": "unavailable", "error": "readiness check failed"}
+    
+    status_code = 200 if result["status"] == "ready" else 503
+    return JSONResponse(result, status_code=status_code, headers=NO_STORE)
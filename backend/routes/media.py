@@ -0,0 +1,166 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+from storage import media_storage
+from etags import http_date, is_not_modified
+from datetime import datetime
+from typing import Optional, Tuple
+import asyncio
+import logging
+import mimetypes
+import os
+import re
+from stat import S_ISREG
+
+router = APIRouter(prefix="/api/media", tags=["media"])
+logger = logging.getLogger(__name__)
+
+# Uploaded variants are named after the hash of their bytes and never change
+CONTENT_HASHED_KEY = re.compile(r"^[0-9a-f]{32}\.[a-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+
+# With nginx in front, set this to an internal location aliased to MEDIA_ROOT
+# (e.g. "/_media/") and nginx sends the file itself
+ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX', '')
+
+# Read size for servers without a zero-copy extension
+FALLBACK_CHUNK_SIZE = 256 * 1024
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) of a single-range header; None to serve the whole file.
+
+    Raises ValueError when the range can't be satisfied.
+    """
+    match = _RANGE.match(header.strip())
+    if not match:
+        # Multiple or malformed ranges: a full 200 response is always allowed
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        # Syntactically invalid (RFC 9110 14.1.1), so the header is ignored
+        return None
+    if start >= size:
+        raise ValueError("range not satisfiable")
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
+
+
+class MediaFileResponse(Response):
+    """Sends (part of) a file without Python-level reads where the server allows.
+
+    Uses the ASGI ``http.response.zerocopysend`` extension (sendfile) or
+    ``http.response.pathsend`` when the server advertises them, and falls
+    back to reading in large chunks off the event loop otherwise.
+    """
+
+    def __init__(self, path, offset: int, count: int, status_code: int, headers: dict, media_type: str, head: bool = False):
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+        self.path = path
+        self.offset = offset
+        self.count = count
+        self.head = head
+        self.headers["content-length"] = str(count)
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.head or self.count == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        extensions = scope.get("extensions") or {}
+        if "http.response.zerocopysend" in extensions:
+            with open(self.path, "rb") as handle:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": handle.fileno(),
+                    "offset": self.offset,
+                    "count": self.count,
+                })
+            return
+        if "http.response.pathsend" in extensions and self.offset == 0 and self.count == os.path.getsize(self.path):
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+            return
+
+        with open(self.path, "rb") as handle:
+            handle.seek(self.offset)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await asyncio.to_thread(handle.read, min(FALLBACK_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b""})
+
+
+@router.api_route("/{key}", methods=["GET", "HEAD"])
+async def get_media(key: str, request: Request):
+    """Serve a stored media file with range and cache validation support"""
+    try:
+        path = media_storage.local_path(key)
+        try:
+            stat = os.stat(path) if path is not None else None
+        except FileNotFoundError:
+            stat = None
+        if stat is None or not S_ISREG(stat.st_mode):
+            raise HTTPException(status_code=404, detail="Media not found")
+
+        immutable = bool(CONTENT_HASHED_KEY.match(key))
+        # Content-hashed names are their own strong validator
+        etag = f'"{key.split(".")[0]}"' if immutable else f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        last_modified = datetime.utcfromtimestamp(int(stat.st_mtime))
+        media_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+        headers = {
+            "ETag": etag,
+            "Last-Modified": http_date(last_modified),
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else DEFAULT_CACHE_CONTROL,
+            "Accept-Ranges": "bytes",
+        }
+
+        if is_not_modified(request, etag, last_modified):
+            return Response(status_code=304, headers=headers)
+
+        if ACCEL_REDIRECT_PREFIX:
+            # nginx serves the file, ranges included, from its internal location
+            headers["X-Accel-Redirect"] = f"{ACCEL_REDIRECT_PREFIX.rstrip('/')}/{key[:2]}/{key}"
+            return Response(headers=headers, media_type=media_type)
+
+        size = stat.st_size
+        byte_range = None
+        range_header = request.headers.get("range")
+        # If-Range: only honour the range if the client's copy is still current
+        if range_header and request.headers.get("if-range", etag) == etag:
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                raise HTTPException(
+                    status_code=416,
+                    detail="Requested range not satisfiable",
+                    headers={"Content-Range": f"bytes */{size}"}
+                )
+
+        if byte_range is None:
+            return MediaFileResponse(path, 0, size, 200, headers, media_type, head=request.method == "HEAD")
+
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return MediaFileResponse(path, start, end - start + 1, 206, headers, media_type, head=request.method == "HEAD")
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error serving media {key}: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
@@ -1,28 +1,58 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from models import Profile, ProfileUpdate, APIResponse
 from database import profile_collection
+from cache import TTLCache
+from responses import render_json, json_bytes_response
+from storage import media_storage
+from uploads import receive_file
+from image_variants import generate_variants
+from etags import collection_versions, make_etag, is_not_modified, not_modified_response, validator_headers
 from datetime import datetime
+from pathlib import Path
 import logging
+import os
+import shutil
 
 router = APIRouter(prefix="/api/profile", tags=["profile"])
 logger = logging.getLogger(__name__)
 
+# Serialized GET /api/profile response; the profile changes rarely, so hot
+# requests skip both Mongo and response serialization
+profile_cache = TTLCache(ttl=float(os.environ.get('PROFILE_CACHE_TTL', '300')), maxsize=1)
+
 @router.get("/")
-async def get_profile():
+async def get_profile(request: Request):
     """Get profile information"""
     try:
+        cached = profile_cache.get("profile")
+        if cached is not None:
+            etag, last_modified, body = cached
+            if is_not_modified(request, etag, last_modified):
+                return not_modified_response(etag, last_modified)
+            return json_bytes_response(body, headers=validator_headers(etag, last_modified))
+        
+        generation = profile_cache.generation
         profile_doc = await profile_collection.find_one()
         if not profile_doc:
             raise HTTPException(status_code=404, detail="Profile not found")
         
         # Remove MongoDB _id field for response
         profile_doc.pop('_id', None)
-        return APIResponse(
+        body = render_json(APIResponse(
             success=True,
             message="Profile retrieved successfully",
             data=profile_doc
-        )
+        ))
+        etag = make_etag(body)
+        last_modified = profile_doc.get("updatedAt")
+        profile_cache.set("profile", (etag, last_modified, body), generation=generation)
+        
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        return json_bytes_response(body, headers=validator_headers(etag, last_modified))
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error retrieving profile: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -49,6 +79,9 @@ async def update_profile(profile_update: ProfileUpdate):
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Profile not found")
         
+        profile_cache.invalidate()
+        collection_versions.bump("profile")
+        
         # Get updated profile
         updated_profile = await profile_collection.find_one()
         updated_profile.pop('_id', None)
@@ -59,22 +92,71 @@ async def update_profile(profile_update: ProfileUpdate):
             data=updated_profile
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error updating profile: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@router.post("/photo")
-async def upload_profile_photo():
-    """Upload profile photo - placeholder for future implementation"""
+# Largest accepted photo upload, in bytes
+PROFILE_PHOTO_MAX_BYTES = int(os.environ.get('PROFILE_PHOTO_MAX_BYTES', str(10 * 1024 * 1024)))
+
+@router.post(
+    "/photo",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"multipart/form-data": {"schema": {
+                "type": "object",
+                "properties": {"photo": {"type": "string", "format": "binary"}},
+                "required": ["photo"],
+            }}},
+        }
+    }
+)
+async def upload_profile_photo(request: Request):
+    """Upload a profile photo and store resized WebP/JPEG variants"""
+    # The body is parsed here rather than through an UploadFile parameter so
+    # the file streams to disk instead of being read in full first
+    staging_path = media_storage.new_staging_path()
+    output_dir = media_storage.new_staging_path()
     try:
-        # This would handle file upload logic
-        # For now, return success message
+        upload = await receive_file(request, "photo", staging_path, PROFILE_PHOTO_MAX_BYTES)
+        
+        output_dir.mkdir()
+        try:
+            variants = await generate_variants(upload.path, output_dir)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Uploaded file is not a supported image")
+        
+        images = {}
+        for variant in variants:
+            await media_storage.put_file(variant["key"], Path(variant["path"]), variant["contentType"])
+            entry = images.setdefault(variant["variant"], {"width": variant["width"], "height": variant["height"]})
+            entry[variant["format"]] = media_storage.url(variant["key"])
+        
+        profile_image = images["1x"]["jpg"]
+        result = await profile_collection.update_one(
+            {},
+            {"$set": {"profileImage": profile_image, "profileImageVariants": images, "updatedAt": datetime.utcnow()}}
+        )
+        if result.matched_count == 0:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        
+        profile_cache.invalidate()
+        collection_versions.bump("profile")
+        
         return APIResponse(
             success=True,
-            message="Photo upload endpoint ready for implementation",
-            data={"note": "File upload functionality to be implemented"}
+            message="Profile photo uploaded successfully",
+            data={"profileImage": profile_image, "variants": images, "sha256": upload.sha256}
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading photo: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error")
+    finally:
+        staging_path.unlink(missing_ok=True)
+        shutil.rmtree(output_dir, ignore_errors=True)
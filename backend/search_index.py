@@ -0,0 +1,277 @@
+import asyncio
+import bisect
+import heapq
+import logging
+import math
+import os
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Field weights used when scoring a term occurrence
+FIELD_WEIGHTS = {
+    "title": 5.0,
+    "excerpt": 2.0,
+    "content": 1.0,
+}
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Seconds between checks for posts written by other processes (0 disables)
+SEARCH_INDEX_REFRESH_SECONDS = float(os.environ.get('SEARCH_INDEX_REFRESH_SECONDS', '30'))
+
+# Fields a post is indexed from
+INDEX_PROJECTION = {
+    "_id": 0, "id": 1, "slug": 1, "published": 1, "category": 1, "createdAt": 1, "updatedAt": 1, "plainText": 1,
+    **{field: 1 for field in FIELD_WEIGHTS},
+}
+
+
+def _stored_time(moment: Optional[datetime]) -> Optional[datetime]:
+    """A datetime as Mongo returns it (millisecond precision), for comparisons"""
+    return moment.replace(microsecond=moment.microsecond // 1000 * 1000) if moment else None
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens"""
+    if not text:
+        return []
+    return TOKEN_RE.findall(text.lower())
+
+
+class BlogSearchIndex:
+    """In-process inverted index over blog posts (term -> post id -> weight).
+
+    Write routes update the index directly. Writes handled by other worker
+    processes are picked up by the periodic ``refresh``, so there they show
+    up within SEARCH_INDEX_REFRESH_SECONDS.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._terms: List[str] = []  # sorted vocabulary for prefix lookups
+        self._doc_terms: Dict[str, Set[str]] = {}
+        self._doc_meta: Dict[str, dict] = {}
+        self._published_slugs: Dict[str, str] = {}  # slug -> post id
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    async def build(self, collection):
+        """(Re)build the index from every post in the collection"""
+        self._postings.clear()
+        self._terms.clear()
+        self._doc_terms.clear()
+        self._doc_meta.clear()
+        self._published_slugs.clear()
+
+        async for post in collection.find({}, INDEX_PROJECTION):
+            self.add(post)
+
+        logger.info(f"Blog search index built with {len(self)} posts and {len(self._terms)} terms")
+
+    def add(self, post: dict):
+        """Index a post, replacing any previous version of it"""
+        post_id = post.get("id")
+        if not post_id:
+            return
+        self.remove(post_id)
+
+        weights: Counter = Counter()
+        for field, field_weight in FIELD_WEIGHTS.items():
+            # Index the markup-free body when the post has one
+            text = post.get("plainText") if field == "content" and post.get("plainText") else post.get(field, "")
+            for term, count in Counter(tokenize(text)).items():
+                weights[term] += field_weight * (1 + math.log(count))
+
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._terms, term)
+            postings[post_id] = weight
+
+        self._doc_terms[post_id] = set(weights)
+        self._doc_meta[post_id] = {
+            "published": post.get("published", True),
+            "category": post.get("category"),
+            "createdAt": post.get("createdAt") or datetime.min,
+            "slug": post.get("slug"),
+            "updatedAt": _stored_time(post.get("updatedAt")),
+        }
+        if post.get("slug") and post.get("published", True):
+            self._published_slugs[post["slug"]] = post_id
+
+    def remove(self, post_id: str):
+        """Drop a post from the index"""
+        terms = self._doc_terms.pop(post_id, None)
+        meta = self._doc_meta.pop(post_id, None)
+        if meta and self._published_slugs.get(meta.get("slug")) == post_id:
+            del self._published_slugs[meta["slug"]]
+        if not terms:
+            return
+
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(post_id, None)
+            if not postings:
+                del self._postings[term]
+                index = bisect.bisect_left(self._terms, term)
+                if index < len(self._terms) and self._terms[index] == term:
+                    self._terms.pop(index)
+
+    async def refresh(self, collection) -> int:
+        """Catch up with posts written by other processes; return how many changed.
+
+        Scans every post's id and updatedAt, re-indexes those whose updatedAt
+        differs from the indexed one and drops indexed posts that are gone.
+        """
+        known = set(self._doc_meta)
+        stored = {}
+        async for post in collection.find({}, {"_id": 0, "id": 1, "updatedAt": 1}):
+            stored[post["id"]] = _stored_time(post.get("updatedAt"))
+
+        changed = [
+            post_id for post_id, updated_at in stored.items()
+            if post_id not in self._doc_meta or self._doc_meta[post_id]["updatedAt"] != updated_at
+        ]
+        # Only posts indexed before the scan, so one added meanwhile isn't dropped
+        removed = [post_id for post_id in known - stored.keys() if post_id in self._doc_meta]
+        for post_id in removed:
+            self.remove(post_id)
+        if changed:
+            async for post in collection.find({"id": {"$in": changed}}, INDEX_PROJECTION):
+                self.add(post)
+        return len(changed) + len(removed)
+
+    async def _run(self, collection, interval: float, on_change: Optional[Callable[[], None]]):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                changed = await self.refresh(collection)
+            except Exception as e:
+                logger.error(f"Error refreshing blog search index: {e}")
+                continue
+            if changed:
+                logger.info(f"Blog search index refreshed {changed} posts")
+                if on_change is not None:
+                    on_change()
+
+    def start(self, collection, interval: float = SEARCH_INDEX_REFRESH_SECONDS, on_change: Optional[Callable[[], None]] = None):
+        """Start the periodic refresh; on_change runs whenever it found changes"""
+        if self._task is None and interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run(collection, interval, on_change))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def has_published_slug(self, slug: str) -> bool:
+        """Whether slug belongs to an indexed, published post"""
+        return slug in self._published_slugs
+
+    def _prefix_expansions(self, prefix: str) -> List[Dict[str, float]]:
+        """Return the postings of every term starting with prefix.
+
+        All matching terms are kept, however many there are; search() probes
+        the remaining candidates instead of merging when that is cheaper.
+        """
+        start = bisect.bisect_left(self._terms, prefix)
+        end = bisect.bisect_left(self._terms, prefix + "\U0010ffff", start)
+        return [self._postings[term] for term in self._terms[start:end]]
+
+    def search(
+        self,
+        query: str,
+        published: Optional[bool] = None,
+        category: Optional[str] = None,
+        limit: Optional[int] = 50,
+    ) -> List[str]:
+        """Return post ids matching every query term, best match first.
+
+        The last term is matched as a prefix unless the query ends in
+        whitespace, so partially typed words still find results.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        expansions = None
+        if not query[-1:].isspace():
+            expansions = self._prefix_expansions(terms.pop())
+            if not expansions:
+                return []
+
+        exact_postings = []
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                return []
+            exact_postings.append(postings)
+
+        # Intersect exact terms starting from the rarest one
+        exact_postings.sort(key=len)
+        scores: Optional[Dict[str, float]] = None
+        for postings in exact_postings:
+            if scores is None:
+                scores = dict(postings)
+            else:
+                scores = {
+                    post_id: score + postings[post_id]
+                    for post_id, score in scores.items()
+                    if post_id in postings
+                }
+            if not scores:
+                return []
+
+        if expansions is not None:
+            expansion_size = sum(len(postings) for postings in expansions)
+            if scores is not None and len(scores) * len(expansions) < expansion_size:
+                # Few candidates left: probe them against each expansion
+                probed = {}
+                for post_id, score in scores.items():
+                    best = max(postings.get(post_id, 0.0) for postings in expansions)
+                    if best:
+                        probed[post_id] = score + best
+                scores = probed
+            else:
+                merged: Dict[str, float] = {}
+                for postings in expansions:
+                    for post_id, weight in postings.items():
+                        if weight > merged.get(post_id, 0.0):
+                            merged[post_id] = weight
+                if scores is None:
+                    scores = merged
+                else:
+                    scores = {
+                        post_id: score + merged[post_id]
+                        for post_id, score in scores.items()
+                        if post_id in merged
+                    }
+
+        candidates = []
+        for post_id, score in scores.items():
+            meta = self._doc_meta[post_id]
+            if published is not None and meta["published"] != published:
+                continue
+            if category is not None and meta["category"] != category:
+                continue
+            candidates.append((score, meta["createdAt"], post_id))
+
+        if limit is None:
+            candidates.sort(reverse=True)
+        else:
+            candidates = heapq.nlargest(limit, candidates)
+        return [post_id for _, _, post_id in candidates]
+
+
+# Shared index used by the blog routes
+blog_search_index = BlogSearchIndex()
@@ -1,7 +1,11 @@
 from fastapi import FastAPI, APIRouter
+from fastapi.responses import Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from compression import CompressionMiddleware
+from metrics import CallbackGauge, MetricsMiddleware, registry
 from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
 import os
 import logging
 from pathlib import Path
@@ -10,10 +14,18 @@ ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # Import routes after loading environment variables
-from routes import profile, contact, blog, analytics
+from routes import profile, contact, blog, analytics, admin, media, health
 
 # Import database initialization
-from database import init_database, close_database
+from database import init_database, close_database, warm_pool, db, blog_collection, analytics_series_collection, pool_monitor, slow_query_recorder
+from indexes import ensure_indexes
+from search_index import blog_search_index
+from etags import collection_versions
+from counters import analytics_counters, contact_status_counters
+from jobs import job_queue
+from image_variants import shutdown_pool
+from health import loop_lag_monitor, readiness
+from trending import trending_posts, warm_from_series
 
 # Create the main app
 app = FastAPI(title="Nelbert Tomicos Portfolio API", version="1.0.0")
@@ -31,15 +43,31 @@ async def root():
 async def health_check():
     return {"status": "healthy", "message": "API is running successfully"}
 
+# Prometheus metrics
+@api_router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return Response(content=registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+registry.register(CallbackGauge("mongo_pool_checked_out", "Pooled MongoDB connections in use", lambda: pool_monitor.stats()["checkedOut"]))
+registry.register(CallbackGauge("mongo_pool_waiting", "Requests waiting for a MongoDB connection", lambda: pool_monitor.stats()["waiting"]))
+registry.register(CallbackGauge("job_queue_queued", "Background jobs waiting for a worker", lambda: job_queue.stats()["queued"]))
+
 # Include all route modules
 app.include_router(profile.router)
 app.include_router(contact.router)
 app.include_router(blog.router)
 app.include_router(analytics.router)
+app.include_router(admin.router)
+app.include_router(media.router)
+app.include_router(health.router)
 
 # Include the base API router
 app.include_router(api_router)
 
+# Compress responses and keep pre-compressed copies of hot GETs; added
+# before CORS so CORS headers still wrap cached responses
+app.add_middleware(CompressionMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -49,6 +77,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so request timings include every other middleware
+app.add_middleware(MetricsMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -59,28 +90,70 @@ logger = logging.getLogger(__name__)
 @app.on_event("startup")
 async def startup_db():
     """Initialize database on startup"""
+    loop_lag_monitor.start()
     try:
+        slow_query_recorder.bind(asyncio.get_running_loop(), db)
+        connections = await warm_pool()
+        logger.info(f"✅ Database pool warmed with {connections} connections")
+        renamed = await blog.dedupe_slugs()
+        if renamed:
+            logger.warning(f"Renamed {renamed} blog posts with duplicate slugs")
+        # A missing unique index fails startup, so readiness never turns green
+        await ensure_indexes(db, strict=True)
         await init_database()
         logger.info("✅ Database initialized successfully")
+        await blog_search_index.build(blog_collection)
+        # Posts written by other workers also invalidate this worker's ETags
+        blog_search_index.start(blog_collection, on_change=lambda: collection_versions.bump("blog_posts"))
+        await analytics_counters.start()
+        await contact_status_counters.start()
+        # Correct any drift in the inbox counts left by the previous process
+        await contact.reconcile_status_counts()
+        await job_queue.start()
+        await warm_from_series(trending_posts, analytics_series_collection)
+        # Readiness stays failing until every step above has completed
+        readiness.mark_initialized()
         logger.info("✅ Portfolio API started successfully")
         logger.info("📁 Available endpoints:")
         logger.info("  - GET /api/ - API root")
         logger.info("  - GET /api/health - Health check")
+        logger.info("  - GET /api/health/live - Liveness probe")
+        logger.info("  - GET /api/health/ready - Readiness probe (Mongo, pool, event loop, startup)")
+        logger.info("  - GET /api/metrics - Prometheus metrics")
         logger.info("  - GET /api/profile - Get profile")
         logger.info("  - PUT /api/profile - Update profile")
+        logger.info("  - POST /api/profile/photo - Upload profile photo")
         logger.info("  - POST /api/contact - Submit contact form")
         logger.info("  - GET /api/contact - Get contacts (admin)")
+        logger.info("  - GET /api/contact/export - Export contacts as NDJSON/CSV (admin)")
+        logger.info("  - PATCH/DELETE /api/contact/bulk - Bulk update/delete contacts (admin)")
         logger.info("  - GET /api/blog - Get blog posts")
+        logger.info("  - GET /api/blog/trending - Get trending posts")
         logger.info("  - POST /api/blog - Create blog post")
         logger.info("  - GET /api/analytics - Get analytics")
+        logger.info("  - GET /api/analytics/series - Get analytics time series")
         logger.info("  - POST /api/analytics/view - Track page view")
+        logger.info("  - GET /api/media/{key} - Uploaded media (range requests supported)")
+        logger.info("  - GET /api/admin/cache - Cache statistics (admin)")
+        logger.info("  - GET /api/admin/indexes - Query plan check (admin)")
+        logger.info("  - GET /api/admin/pool - Connection pool statistics (admin)")
+        logger.info("  - GET /api/admin/jobs - Job queue statistics (admin)")
+        logger.info("  - POST /api/admin/contact-counts/reconcile - Recount inbox status totals (admin)")
+        logger.info("  - GET/DELETE /api/admin/slow-queries - Slow Mongo queries and plans (admin)")
     except Exception as e:
+        readiness.mark_failed(e)
         logger.error(f"❌ Database initialization failed: {e}")
 
 @app.on_event("shutdown")
 async def shutdown_db():
     """Close database connection on shutdown"""
     try:
+        await job_queue.stop()
+        await blog_search_index.stop()
+        await analytics_counters.stop()
+        await contact_status_counters.stop()
+        shutdown_pool()
+        await loop_lag_monitor.stop()
         await close_database()
         logger.info("✅ Database connection closed")
     except Exception as e:
@@ -0,0 +1,75 @@
+import asyncio
+import os
+from abc import ABC, abstractmethod
+import re
+import shutil
+import uuid
+from pathlib import Path
+from typing import Optional
+
+MEDIA_ROOT = Path(os.environ.get('MEDIA_ROOT', Path(__file__).parent / 'media'))
+MEDIA_URL_PREFIX = "/api/media"
+
+# Keys are flat, content-hashed file names like "3f2a...e1.webp"
+_KEY_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]*(\.[A-Za-z0-9]+)?$")
+
+
+def valid_key(key: str) -> bool:
+    """Whether key is a well-formed media key (no paths or traversal)"""
+    return bool(_KEY_PATTERN.match(key))
+
+
+class Storage(ABC):
+    """Where uploaded media is kept; subclass to put it in an object store.
+
+    Uploads are always staged on local disk first (``new_staging_path``) so
+    they can be hashed and resized before ``put_file`` hands them over.
+    """
+
+    def __init__(self, staging_dir: Path):
+        self.staging_dir = Path(staging_dir)
+
+    def new_staging_path(self) -> Path:
+        """Fresh local path for an upload or derived file in progress"""
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        return self.staging_dir / uuid.uuid4().hex
+
+    @abstractmethod
+    async def put_file(self, key: str, source: Path, content_type: str):
+        """Store source under key, consuming the staged file"""
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Path on this machine for serving key directly, if the store is local"""
+        return None
+
+    def url(self, key: str) -> str:
+        """Public URL of a stored key"""
+        return f"{MEDIA_URL_PREFIX}/{key}"
+
+
+class LocalStorage(Storage):
+    """Media files on local disk under root, fanned out by key prefix"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        # Staging lives inside root so put_file is a same-filesystem rename
+        super().__init__(self.root / ".staging")
+
+    def local_path(self, key: str) -> Optional[Path]:
+        if not valid_key(key):
+            return None
+        return self.root / key[:2] / key
+
+    async def put_file(self, key: str, source: Path, content_type: str):
+        path = self.local_path(key)
+        if path is None:
+            raise ValueError(f"Invalid media key '{key}'")
+        if path.exists():
+            # Same content, same key: keep the stored copy
+            source.unlink(missing_ok=True)
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(shutil.move, str(source), str(path))
+
+
+media_storage = LocalStorage(MEDIA_ROOT)
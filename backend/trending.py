@@ -0,0 +1,91 @@
+import bisect
+import logging
+import math
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from counters import decode_field_key
+
+logger = logging.getLogger(__name__)
+
+# Rescale stored scores once the forward-decay exponent grows past this
+MAX_EXPONENT = 50.0
+
+
+class DecayingTopK:
+    """Exponentially decaying hit scores with an always-sorted ranking.
+
+    Uses forward decay: a hit at time t adds exp((t - landmark) / tau) to the
+    key's score, which orders keys exactly like decaying every score as time
+    passes but never touches keys that aren't hit. Because the order is
+    stable over time, ranking is kept as a sorted list and top(k) is a slice.
+    At most ``capacity`` keys are tracked; the coldest one is evicted.
+    """
+
+    def __init__(self, half_life: float = 6 * 3600, capacity: int = 1000):
+        self.tau = half_life / math.log(2)
+        self.capacity = capacity
+        self._landmark = time.time()
+        self._scores: Dict[str, float] = {}
+        self._ranked: List[Tuple[float, str]] = []  # ascending (score, key)
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def hit(self, key: str, amount: float = 1.0, at: Optional[float] = None):
+        """Record amount hits on key at the given unix time (default now)"""
+        at = time.time() if at is None else at
+        exponent = (at - self._landmark) / self.tau
+        if exponent > MAX_EXPONENT:
+            self._rescale(at)
+            exponent = 0.0
+
+        weight = amount * math.exp(exponent)
+        old_score = self._scores.get(key)
+        if old_score is not None:
+            self._ranked.pop(bisect.bisect_left(self._ranked, (old_score, key)))
+            new_score = old_score + weight
+        else:
+            new_score = weight
+
+        self._scores[key] = new_score
+        bisect.insort(self._ranked, (new_score, key))
+
+        if len(self._ranked) > self.capacity:
+            _, evicted = self._ranked.pop(0)
+            del self._scores[evicted]
+
+    def top(self, k: int, now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Return the k hottest keys with their current decayed scores"""
+        now = time.time() if now is None else now
+        decay = math.exp(-(now - self._landmark) / self.tau)
+        return [(key, score * decay) for score, key in reversed(self._ranked[-k:])] if k > 0 else []
+
+    def _rescale(self, at: float):
+        # Move the landmark forward so scores stay within float range
+        factor = math.exp(-(at - self._landmark) / self.tau)
+        self._landmark = at
+        self._scores = {key: score * factor for key, score in self._scores.items()}
+        self._ranked = sorted((score, key) for key, score in self._scores.items())
+
+
+async def warm_from_series(tracker: DecayingTopK, series_collection, hours: int = 24):
+    """Seed a tracker from the per-post counts in recent hour buckets"""
+    since = datetime.utcnow() - timedelta(hours=hours)
+    async for bucket in series_collection.find(
+        {"granularity": "hour", "bucket": {"$gte": since}},
+        {"_id": 0, "bucket": 1, "counts.posts": 1}
+    ):
+        at = (bucket["bucket"] - datetime(1970, 1, 1)).total_seconds()
+        for key, views in bucket.get("counts", {}).get("posts", {}).items():
+            tracker.hit(decode_field_key(key), views, at=at)
+    logger.info(f"Trending tracker warmed with {len(tracker)} posts")
+
+
+# Shared tracker of recently viewed blog posts
+trending_posts = DecayingTopK(
+    half_life=float(os.environ.get('TRENDING_HALF_LIFE_HOURS', '6')) * 3600,
+    capacity=int(os.environ.get('TRENDING_CAPACITY', '1000'))
+)
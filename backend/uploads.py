@@ -0,0 +1,137 @@
+"""Streaming multipart upload handling.
+
+FastAPI's ``UploadFile`` parameters make Starlette read the whole form before
+the route runs. ``receive_file`` instead feeds ``request.stream()`` through
+python-multipart chunk by chunk, writing the one file field it is after
+straight to disk while hashing it, and stops with a 413 as soon as the file
+passes the size limit.
+"""
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+import multipart
+from fastapi import HTTPException, Request
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import parse_options_header
+
+# Allowance for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+@dataclass
+class ReceivedFile:
+    path: Path
+    filename: Optional[str]
+    content_type: Optional[str]
+    size: int
+    sha256: str
+
+
+class _PartTracker:
+    """python-multipart callbacks that collect the target field's data"""
+
+    def __init__(self, field_name: str):
+        self.field_name = field_name
+        self.chunks: List[bytes] = []
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.found = False
+        self.complete = False
+        self._in_target = False
+        self._header_name = b""
+        self._header_value = b""
+        self._headers = {}
+
+    def on_part_begin(self):
+        self._headers = {}
+
+    def on_header_field(self, data, start, end):
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        self._in_target = name == self.field_name and b"filename" in options and not self.found
+        if self._in_target:
+            self.found = True
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+            self.content_type = self._headers.get(b"content-type", b"").decode("latin-1") or None
+
+    def on_part_data(self, data, start, end):
+        if self._in_target:
+            self.chunks.append(bytes(data[start:end]))
+
+    def on_part_end(self):
+        if self._in_target:
+            self.complete = True
+        self._in_target = False
+
+    def callbacks(self) -> dict:
+        return {
+            name: getattr(self, name)
+            for name in (
+                "on_part_begin", "on_header_field", "on_header_value", "on_header_end",
+                "on_headers_finished", "on_part_data", "on_part_end",
+            )
+        }
+
+
+async def receive_file(request: Request, field_name: str, destination: Path, max_size: int) -> ReceivedFile:
+    """Stream one file field of a multipart request body to destination"""
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or not params.get(b"boundary"):
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_size + MULTIPART_OVERHEAD:
+        raise HTTPException(status_code=413, detail=f"File exceeds the {max_size // (1024 * 1024)} MB limit")
+
+    tracker = _PartTracker(field_name)
+    parser = multipart.MultipartParser(params[b"boundary"], tracker.callbacks())
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        with open(destination, "wb") as handle:
+            async for chunk in request.stream():
+                parser.write(chunk)
+                for data in tracker.chunks:
+                    size += len(data)
+                    if size > max_size:
+                        raise HTTPException(status_code=413, detail=f"File exceeds the {max_size // (1024 * 1024)} MB limit")
+                    digest.update(data)
+                    await asyncio.to_thread(handle.write, data)
+                tracker.chunks.clear()
+                if tracker.complete:
+                    # Later parts can't change the upload, so stop reading here
+                    break
+            parser.finalize()
+    except MultipartParseError:
+        destination.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail="Malformed multipart body")
+    except BaseException:
+        destination.unlink(missing_ok=True)
+        raise
+
+    if not tracker.complete or size == 0:
+        destination.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail=f"No file uploaded in the '{field_name}' field")
+
+    return ReceivedFile(
+        path=destination,
+        filename=tracker.filename,
+        content_type=tracker.content_type,
+        size=size,
+        sha256=digest.hexdigest(),
+    )
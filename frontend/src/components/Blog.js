@@ -20,7 +20,7 @@ const Blog = () => {
       setLoading(true);
       setError(null);
       
-      const params = {};
+      const params = { view: 'list' };
       if (selectedCategory !== 'all') {
         params.category = selectedCategory;
       }
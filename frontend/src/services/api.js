@@ -42,8 +42,8 @@ export const contactAPI = {
     return response.data;
   },
   
-  getAll: async () => {
-    const response = await apiClient.get('/contact');
+  getAll: async (params = {}) => {
+    const response = await apiClient.get('/contact', { params });
     return response.data;
   },
   
@@ -55,6 +55,16 @@ export const contactAPI = {
   delete: async (contactId) => {
     const response = await apiClient.delete(`/contact/${contactId}`);
     return response.data;
+  },
+  
+  bulkUpdate: async (ids, updateData) => {
+    const response = await apiClient.patch('/contact/bulk', { ids, update: updateData });
+    return response.data;
+  },
+  
+  bulkDelete: async (ids) => {
+    const response = await apiClient.delete('/contact/bulk', { data: { ids } });
+    return response.data;
   }
 };
 
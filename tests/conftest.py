@@ -0,0 +1,98 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# The backend is a flat set of modules run from its own directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+# database.py and storage.py read these at import time
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "portfolio_test")
+os.environ.setdefault("MEDIA_ROOT", tempfile.mkdtemp(prefix="portfolio-media-"))
+# Tests refresh the search index themselves
+os.environ.setdefault("SEARCH_INDEX_REFRESH_SECONDS", "0")
+
+
+def _use_mongomock():
+    """Point the database module at an in-memory mongomock-motor client"""
+    import motor.motor_asyncio
+    from mongomock_motor import AsyncMongoMockClient
+
+    class MockClient(AsyncMongoMockClient):
+        # The mock doesn't take the pool options or event listeners
+        def __init__(self, host=None, **kwargs):
+            super().__init__(host)
+
+    motor.motor_asyncio.AsyncIOMotorClient = MockClient
+
+
+_use_mongomock()
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    """One started app for the whole session; module-level state is bound to its loop"""
+    from fastapi.testclient import TestClient
+
+    import server
+
+    with TestClient(server.app) as client:
+        yield client
+
+
+@pytest.fixture
+def api(app_client):
+    """Test client over freshly seeded collections and empty caches"""
+    import ratelimit
+    from compression import response_variants
+    from counters import analytics_counters, contact_status_counters
+    from database import blog_collection, db, init_database
+    from etags import collection_versions
+    from rendering import rendered_html_cache
+    from routes.contact import contact_dedup
+    from routes.profile import profile_cache
+    from search_index import blog_search_index
+
+    async def reset():
+        # Write out buffered counters first so they can't land after the wipe
+        await analytics_counters.flush()
+        await contact_status_counters.flush()
+        # delete_many rather than drop, so the indexes stay in place
+        for name in await db.list_collection_names():
+            await db[name].delete_many({})
+        await init_database()
+        await blog_search_index.build(blog_collection)
+
+    app_client.portal.call(reset)
+    for cache in (response_variants, rendered_html_cache, contact_dedup, profile_cache):
+        cache.invalidate()
+    ratelimit.default_backend._buckets.clear()
+    collection_versions.bump("blog_posts")
+    collection_versions.bump("profile")
+    yield app_client
+
+
+@pytest.fixture
+def submit_contacts(api):
+    """Submit count contact forms and wait for their jobs; returns the contact ids"""
+    from jobs import job_queue
+
+    def submit(count: int) -> list:
+        ids = []
+        for index in range(count):
+            response = api.post("/api/contact/", json={
+                "name": f"Client {index}",
+                "email": f"client{index}@example.com",
+                "subject": "Inquiry",
+                "message": f"Message number {index}",
+            })
+            assert response.status_code == 200
+            ids.append(response.json()["contact"]["id"])
+        # Counts are updated by the contact.submitted job
+        api.portal.call(job_queue._get_queue().join)
+        return ids
+
+    return submit
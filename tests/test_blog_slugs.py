@@ -0,0 +1,65 @@
+from datetime import datetime
+
+import pytest
+
+POST = {
+    "title": "Same Title",
+    "content": "Body text.",
+    "category": "Tips",
+    "image": "https://example.com/image.jpg",
+}
+
+
+def test_repeated_titles_get_the_next_free_suffix(api):
+    slugs = [api.post("/api/blog/", json=POST).json()["data"]["slug"] for _ in range(3)]
+    assert slugs == ["same-title", "same-title-1", "same-title-2"]
+
+    # A freed suffix is reused
+    posts = api.get("/api/blog/?search=same&view=list").json()["data"]["posts"]
+    middle = next(post for post in posts if post["slug"] == "same-title-1")
+    assert api.delete(f"/api/blog/{middle['id']}").status_code == 200
+    assert api.post("/api/blog/", json=POST).json()["data"]["slug"] == "same-title-1"
+
+
+def test_slug_claimed_concurrently_is_allocated_again(api, monkeypatch):
+    from routes import blog
+
+    existing = api.post("/api/blog/", json=POST).json()["data"]["slug"]
+    allocate = blog.allocate_slug
+    calls = []
+
+    async def racing_allocate(base_slug, exclude_id=None):
+        calls.append(base_slug)
+        # The first allocation hands out a slug another request just took
+        if len(calls) == 1:
+            return existing
+        return await allocate(base_slug, exclude_id)
+
+    monkeypatch.setattr(blog, "allocate_slug", racing_allocate)
+    response = api.post("/api/blog/", json=POST)
+    assert response.status_code == 200
+    assert response.json()["data"]["slug"] == "same-title-1"
+    assert len(calls) == 2
+
+
+def test_duplicate_slugs_are_renamed_before_indexing(api):
+    from database import blog_collection, db
+    from indexes import UniqueIndexError, ensure_indexes
+    from routes.blog import dedupe_slugs
+
+    async def scenario():
+        await blog_collection.drop_index("slug_1")
+        for index, created in enumerate((datetime(2024, 1, 2), datetime(2024, 1, 1), datetime(2024, 1, 3))):
+            await blog_collection.insert_one({"id": f"dup-{index}", "slug": "dup", "createdAt": created})
+        with pytest.raises(UniqueIndexError):
+            await ensure_indexes(db, strict=True)
+
+        renamed = await dedupe_slugs()
+        await ensure_indexes(db, strict=True)
+        posts = await blog_collection.find({"id": {"$regex": "^dup-"}}, {"_id": 0, "id": 1, "slug": 1}).to_list(None)
+        return renamed, {post["id"]: post["slug"] for post in posts}
+
+    renamed, slugs = api.portal.call(scenario)
+    assert renamed == 2
+    # The oldest post keeps the slug
+    assert slugs == {"dup-1": "dup", "dup-0": "dup-1", "dup-2": "dup-2"}
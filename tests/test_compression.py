@@ -0,0 +1,37 @@
+import pytest
+
+import compression
+from compression import choose_encoding
+
+
+@pytest.fixture(params=[True, False], ids=["brotli", "gzip-only"])
+def brotli_available(request, monkeypatch):
+    if request.param and compression.brotli is None:
+        pytest.skip("brotli not installed")
+    if not request.param:
+        monkeypatch.setattr(compression, "brotli", None)
+    return request.param
+
+
+def test_prefers_brotli_when_available(brotli_available):
+    assert choose_encoding("gzip, deflate, br") == ("br" if brotli_available else "gzip")
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", "gzip"),
+    ("", None),
+    ("identity", None),
+    ("deflate", None),
+    ("GZIP;q=0.5", "gzip"),
+    ("gzip;q=0", None),
+    ("gzip;q=bogus", None),
+])
+def test_gzip_selection(header, expected, monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding(header) == expected
+
+
+def test_quality_values_pick_highest(brotli_available):
+    assert choose_encoding("br;q=0.2, gzip;q=0.8") == "gzip"
+    assert choose_encoding("*;q=0.5") == ("br" if brotli_available else "gzip")
+    assert choose_encoding("*, br;q=0") == "gzip"
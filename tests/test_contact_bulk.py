@@ -0,0 +1,50 @@
+def inbox_counts(api) -> dict:
+    return api.get("/api/contact/").json()["data"]["counts"]
+
+
+def test_bulk_update_reports_each_id(api, submit_contacts):
+    ids = submit_contacts(3)
+    response = api.patch("/api/contact/bulk", json={
+        "ids": [ids[0], "missing", ids[1], ids[0]],
+        "update": {"status": "read"},
+    })
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["matched"] == 2
+    assert data["results"] == [
+        {"id": ids[0], "result": "updated"},
+        {"id": "missing", "result": "not_found"},
+        {"id": ids[1], "result": "updated"},
+    ]
+    assert inbox_counts(api) == {"new": 1, "read": 2, "replied": 0}
+
+
+def test_bulk_update_by_filter(api, submit_contacts):
+    submit_contacts(3)
+    response = api.patch("/api/contact/bulk", json={"filter": {"status": "new"}, "update": {"status": "replied"}})
+    assert response.json()["data"] == {"matched": 3, "modified": 3}
+    assert inbox_counts(api) == {"new": 0, "read": 0, "replied": 3}
+
+
+def test_bulk_delete_reports_each_id(api, submit_contacts):
+    ids = submit_contacts(2)
+    response = api.request("DELETE", "/api/contact/bulk", json={"ids": [ids[1], "missing"]})
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["deleted"] == 1
+    assert data["results"] == [
+        {"id": ids[1], "result": "deleted"},
+        {"id": "missing", "result": "not_found"},
+    ]
+    assert inbox_counts(api) == {"new": 1, "read": 0, "replied": 0}
+
+
+def test_bulk_requests_need_exactly_one_target(api, submit_contacts):
+    ids = submit_contacts(1)
+    update = {"status": "read"}
+    assert api.patch("/api/contact/bulk", json={"update": update}).status_code == 400
+    assert api.patch("/api/contact/bulk", json={"ids": ids, "filter": {"status": "new"}, "update": update}).status_code == 400
+    # An empty filter would match every contact
+    assert api.request("DELETE", "/api/contact/bulk", json={"filter": {}}).status_code == 400
+    assert api.patch("/api/contact/bulk", json={"ids": ids, "update": {}}).status_code == 400
+    assert inbox_counts(api)["new"] == 1
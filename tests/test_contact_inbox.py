@@ -0,0 +1,46 @@
+def inbox_counts(api) -> dict:
+    return api.get("/api/contact/").json()["data"]["counts"]
+
+
+def test_counts_follow_create_update_and_delete(api, submit_contacts):
+    ids = submit_contacts(3)
+    assert inbox_counts(api) == {"new": 3, "read": 0, "replied": 0}
+
+    assert api.put(f"/api/contact/{ids[0]}", json={"status": "read"}).status_code == 200
+    assert api.put(f"/api/contact/{ids[1]}", json={"status": "replied"}).status_code == 200
+    assert inbox_counts(api) == {"new": 1, "read": 1, "replied": 1}
+
+    assert api.delete(f"/api/contact/{ids[1]}").status_code == 200
+    assert inbox_counts(api) == {"new": 1, "read": 1, "replied": 0}
+
+
+def test_inbox_filters_by_status(api, submit_contacts):
+    ids = submit_contacts(2)
+    api.put(f"/api/contact/{ids[0]}", json={"status": "read"})
+    contacts = api.get("/api/contact/?status=read").json()["data"]["contacts"]
+    assert [contact["id"] for contact in contacts] == [ids[0]]
+
+
+def test_unknown_status_is_rejected(api, submit_contacts):
+    contact_id = submit_contacts(1)[0]
+    for status in ("$x", "a.b", "archived"):
+        assert api.put(f"/api/contact/{contact_id}", json={"status": status}).status_code == 422
+
+
+def test_reconcile_repairs_drifted_counts(api, submit_contacts):
+    from counters import contact_status_counters
+    from database import counters_collection
+
+    submit_contacts(2)
+    api.portal.call(contact_status_counters.flush)
+    api.portal.call(
+        counters_collection.update_one,
+        {"id": "contact_status"},
+        {"$set": {"new": 7, "read": -1, "junk": {"nested": 1}}},
+    )
+    assert inbox_counts(api)["new"] == 7
+
+    response = api.post("/api/admin/contact-counts/reconcile")
+    assert response.status_code == 200
+    assert response.json()["data"]["counts"] == {"new": 2, "read": 0, "replied": 0}
+    assert inbox_counts(api) == {"new": 2, "read": 0, "replied": 0}
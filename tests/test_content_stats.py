@@ -0,0 +1,39 @@
+from content_stats import content_fields, count_words, make_excerpt, reading_time, to_plain_text
+
+
+def test_plain_text_strips_markup():
+    content = (
+        "# Heading\n\n"
+        "Some **bold** and _italic_ text with a [link](https://example.com) "
+        "and ![alt text](image.png).\n\n"
+        "- item one\n"
+        "> quoted &amp; <span>inline</span>\n\n"
+        "```python\nprint('hidden')\n```\n"
+    )
+    assert to_plain_text(content) == (
+        "Heading Some bold and italic text with a link and alt text. item one quoted & inline"
+    )
+
+
+def test_count_words_keeps_contractions_and_hyphens():
+    assert count_words("Don't over-think it, 2 times") == 5
+
+
+def test_reading_time_rounds_up_with_minimum():
+    assert reading_time(0) == "1 min read"
+    assert reading_time(200) == "1 min read"
+    assert reading_time(201) == "2 min read"
+
+
+def test_excerpt_cuts_on_word_boundary():
+    assert make_excerpt("short text") == "short text"
+    excerpt = make_excerpt("word, " * 40, length=20)
+    assert excerpt == "word, word, word..."
+    assert len(excerpt) <= 23
+
+
+def test_content_fields():
+    fields = content_fields("## Title\n\n" + "word " * 250)
+    assert fields["wordCount"] == 251
+    assert fields["readTime"] == "2 min read"
+    assert fields["plainText"].startswith("Title word")
@@ -0,0 +1,136 @@
+import asyncio
+
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from counters import CounterBuffer, decode_field_key, encode_field_key
+
+
+class FakeCollection:
+    """Records writes; raises the queued errors first, one per call"""
+
+    def __init__(self, errors=None, delay=0.0):
+        self.errors = list(errors or [])
+        self.delay = delay
+        self.updates = []
+        self.bulk_writes = []
+
+    async def update_one(self, document_filter, update, upsert=False):
+        await asyncio.sleep(self.delay)
+        if self.errors:
+            raise self.errors.pop(0)
+        self.updates.append(update)
+
+    async def bulk_write(self, operations, ordered=True):
+        await asyncio.sleep(self.delay)
+        self.bulk_writes.append(operations)
+        if self.errors:
+            raise self.errors.pop(0)
+
+
+def bulk_error(*write_errors):
+    return BulkWriteError({"writeErrors": list(write_errors), "writeConcernErrors": []})
+
+
+def test_flush_combines_increments():
+    async def scenario():
+        collection = FakeCollection()
+        buffer = CounterBuffer(collection, defaults={"id": "current", "websiteViews": 0, "blogViews": 0})
+        buffer.incr("websiteViews")
+        buffer.incr("websiteViews", 2)
+        buffer.incr("blogViews")
+        assert buffer.pending() == {"websiteViews": 3, "blogViews": 1}
+        await buffer.flush()
+        return collection, buffer
+
+    collection, buffer = asyncio.run(scenario())
+    assert len(collection.updates) == 1
+    update = collection.updates[0]
+    assert update["$inc"] == {"websiteViews": 3, "blogViews": 1}
+    # Fields being incremented can't also be set on insert
+    assert "websiteViews" not in update["$setOnInsert"]
+    assert buffer.pending() == {}
+
+
+def test_failed_flush_is_retried():
+    async def scenario():
+        collection = FakeCollection(errors=[PyMongoError("network")])
+        buffer = CounterBuffer(collection)
+        buffer.incr("blogViews", 2)
+        await buffer.flush()
+        assert buffer.pending() == {"blogViews": 2}
+        buffer.incr("blogViews")
+        await buffer.flush()
+        return collection, buffer
+
+    collection, buffer = asyncio.run(scenario())
+    assert [update["$inc"] for update in collection.updates] == [{"blogViews": 3}]
+    assert buffer.pending() == {}
+
+
+def test_series_rolls_up_into_every_granularity():
+    async def scenario():
+        series = FakeCollection()
+        buffer = CounterBuffer(FakeCollection(), series_collection=series)
+        buffer.incr("blogViews", 4)
+        await buffer.flush()
+        return series
+
+    series = asyncio.run(scenario())
+    operations = series.bulk_writes[0]
+    assert sorted(op._filter["granularity"] for op in operations) == ["day", "hour", "minute"]
+    assert all(op._doc["$inc"] == {"counts.blogViews": 4} for op in operations)
+    # Only retained granularities expire
+    assert {op._filter["granularity"] for op in operations if "$setOnInsert" in op._doc} == {"minute", "hour"}
+
+
+def test_partial_bulk_failure_retries_only_failed_operations():
+    async def scenario():
+        series = FakeCollection(errors=[bulk_error(
+            {"index": 1, "code": 112, "errmsg": "write conflict"},
+            {"index": 2, "code": 52, "errmsg": "dollar-prefixed field"},
+        )])
+        posts = FakeCollection(errors=[bulk_error({"index": 0, "code": 11000, "errmsg": "duplicate key"})])
+        buffer = CounterBuffer(FakeCollection(), series_collection=series, posts_collection=posts)
+        buffer.incr("blogViews")
+        buffer.incr_post_view("first")
+        buffer.incr_post_view("second")
+        await buffer.flush()
+        await buffer.flush()
+        await buffer.flush()
+        return series, posts
+
+    series, posts = asyncio.run(scenario())
+    # The conflicting bucket is retried once; the permanent failure is dropped
+    assert len(series.bulk_writes) == 2
+    assert len(series.bulk_writes[1]) == 1
+    assert series.bulk_writes[1][0]._doc["$inc"]["counts.blogViews"] == 1
+    assert [op._filter for op in posts.bulk_writes[1]] == [{"slug": "first"}]
+
+
+def test_post_view_series_key_is_escaped():
+    async def scenario():
+        series = FakeCollection()
+        buffer = CounterBuffer(FakeCollection(), series_collection=series)
+        buffer.incr_post_view("v1.2$draft")
+        await buffer.flush()
+        return series
+
+    operations = asyncio.run(scenario()).bulk_writes[0]
+    assert operations[0]._doc["$inc"] == {"counts.posts.v1%2E2%24draft": 1}
+    assert decode_field_key(encode_field_key("100%.$")) == "100%.$"
+
+
+def test_stop_finishes_a_flush_in_progress():
+    async def scenario():
+        collection = FakeCollection(delay=0.05)
+        buffer = CounterBuffer(collection, flush_interval=0.01)
+        await buffer.start()
+        buffer.incr("websiteViews", 3)
+        # Let the periodic flush start writing, then stop in the middle of it
+        await asyncio.sleep(0.03)
+        await buffer.stop()
+        return collection, buffer
+
+    collection, buffer = asyncio.run(scenario())
+    assert [update["$inc"] for update in collection.updates] == [{"websiteViews": 3}]
+    assert buffer.pending() == {}
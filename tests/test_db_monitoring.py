@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from db_monitoring import command_filter, query_shape
+
+
+def test_query_shape_replaces_literals():
+    shape = query_shape({
+        "slug": "my-post",
+        "published": True,
+        "createdAt": {"$lt": datetime(2024, 1, 1)},
+        "id": {"$in": ["a", "b", "c"]},
+    })
+    assert shape == {"slug": "?", "published": "?", "createdAt": {"$lt": "?"}, "id": {"$in": ["?"]}}
+
+
+def test_query_shape_keeps_branch_structure():
+    shape = query_shape({"$or": [{"createdAt": {"$lt": 1}}, {"createdAt": 1, "id": {"$lt": "x"}}]})
+    assert shape == {"$or": [{"createdAt": {"$lt": "?"}}, {"createdAt": "?", "id": {"$lt": "?"}}]}
+    assert query_shape({"tags": []}) == {"tags": []}
+
+
+def test_query_shape_of_pipeline():
+    pipeline = [{"$match": {"status": "new"}}, {"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+    assert query_shape(pipeline) == [
+        {"$match": {"status": "?"}},
+        {"$group": {"_id": "?", "count": {"$sum": "?"}}},
+    ]
+
+
+def test_command_filter_of_updates():
+    command = {"update": "contacts", "updates": [{"q": {"id": "1"}, "u": {"$set": {"status": "read"}}}]}
+    assert command_filter("update", command) == [{"q": {"id": "1"}}]
+    assert command_filter("ping", {"ping": 1}) is None
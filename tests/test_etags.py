@@ -0,0 +1,58 @@
+NEW_POST = {
+    "title": "Validator test post",
+    "content": "Body of the validator test post.",
+    "category": "Tips",
+    "image": "https://example.com/image.jpg",
+}
+
+
+def first_slug(api) -> str:
+    return api.get("/api/blog/?view=list").json()["data"]["posts"][0]["slug"]
+
+
+def test_blog_list_revalidates_until_a_write(api):
+    response = api.get("/api/blog/")
+    etag = response.headers["etag"]
+
+    not_modified = api.get("/api/blog/", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    assert api.post("/api/blog/", json=NEW_POST).status_code == 200
+    changed = api.get("/api/blog/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert any(post["title"] == NEW_POST["title"] for post in changed.json()["data"]["posts"])
+
+
+def test_query_is_part_of_the_list_etag(api):
+    assert api.get("/api/blog/?view=list").headers["etag"] != api.get("/api/blog/").headers["etag"]
+
+
+def test_blog_post_revalidation(api):
+    slug = first_slug(api)
+    response = api.get(f"/api/blog/{slug}")
+    assert response.headers["last-modified"]
+    etag = response.headers["etag"]
+    assert api.get(f"/api/blog/{slug}", headers={"If-None-Match": etag}).status_code == 304
+    assert api.get(f"/api/blog/{slug}", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_wildcard_only_matches_existing_posts(api):
+    from trending import trending_posts
+
+    assert api.get(f"/api/blog/{first_slug(api)}", headers={"If-None-Match": "*"}).status_code == 304
+    missing = api.get("/api/blog/nope.with$dollar", headers={"If-None-Match": "*"})
+    assert missing.status_code == 404
+    assert "nope.with$dollar" not in [key for key, _ in trending_posts.top(1000)]
+
+
+def test_profile_etag_changes_after_update(api):
+    etag = api.get("/api/profile/").headers["etag"]
+    assert api.get("/api/profile/", headers={"If-None-Match": etag}).status_code == 304
+
+    assert api.put("/api/profile/", json={"location": "Cebu, Philippines"}).status_code == 200
+    changed = api.get("/api/profile/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["data"]["location"] == "Cebu, Philippines"
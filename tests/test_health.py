@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import pytest
+
+from health import readiness
+
+
+@pytest.fixture
+def fresh_readiness(api, monkeypatch):
+    """Readiness with the cached result dropped, restored after the test"""
+    monkeypatch.setattr(readiness, "_result", None)
+    monkeypatch.setattr(readiness, "_checked_at", 0.0)
+    monkeypatch.setattr(readiness, "initialized", readiness.initialized)
+    monkeypatch.setattr(readiness, "init_error", readiness.init_error)
+    yield readiness
+    readiness._result = None
+
+
+def test_liveness(api):
+    response = api.get("/api/health/live")
+    assert response.status_code == 200
+    assert response.json()["status"] == "alive"
+    assert response.headers["cache-control"] == "no-store"
+
+
+def test_ready_after_startup(api, fresh_readiness):
+    response = api.get("/api/health/ready")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["checks"]["mongo"]["ok"]
+
+
+def test_not_ready_until_startup_completes(api, fresh_readiness):
+    fresh_readiness.initialized = False
+    response = api.get("/api/health/ready")
+    assert response.status_code == 503
+    assert response.json()["checks"]["init"] == {"ok": False}
+
+
+def test_not_ready_after_failed_startup(api, fresh_readiness):
+    fresh_readiness.mark_failed(RuntimeError("unique index on blog_posts.slug failed"))
+    response = api.get("/api/health/ready")
+    assert response.status_code == 503
+    assert "unique index" in response.json()["checks"]["init"]["error"]
+
+
+def test_not_ready_when_mongo_ping_fails(api, fresh_readiness, monkeypatch):
+    async def unreachable(*args, **kwargs):
+        raise ConnectionError("mongo unreachable")
+
+    monkeypatch.setattr(fresh_readiness, "client", SimpleNamespace(admin=SimpleNamespace(command=unreachable)))
+    response = api.get("/api/health/ready")
+    assert response.status_code == 503
+    assert response.json()["checks"]["mongo"] == {"ok": False, "error": "mongo unreachable"}
+
+
+def test_result_is_cached_for_the_window(api, fresh_readiness):
+    assert api.get("/api/health/ready").status_code == 200
+    # Within the window the earlier result is served without re-checking
+    fresh_readiness.initialized = False
+    assert api.get("/api/health/ready").status_code == 200
@@ -0,0 +1,119 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from database import db
+from jobs import JobQueue
+
+
+async def wait_for(condition, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out waiting for the job queue"
+        await asyncio.sleep(0.005)
+
+
+def make_queue(**kwargs) -> JobQueue:
+    options = {"workers": 1, "max_attempts": 3, "base_delay": 0.01, "max_delay": 0.05}
+    options.update(kwargs)
+    return JobQueue(db.test_outbox, **options)
+
+
+def test_failed_job_is_retried_until_it_succeeds(api):
+    queue = make_queue()
+    calls = []
+
+    @queue.handler("flaky")
+    async def flaky(payload):
+        calls.append(payload)
+        if len(calls) < 3:
+            raise RuntimeError("temporary failure")
+
+    async def scenario():
+        await queue.start()
+        try:
+            await queue.enqueue("flaky", {"n": 1})
+            await wait_for(lambda: queue.stats()["processed"] == 1)
+            return queue.stats(), await db.test_outbox.count_documents({})
+        finally:
+            await queue.stop()
+
+    stats, outbox_size = api.portal.call(scenario)
+    assert calls == [{"n": 1}] * 3
+    assert stats["retried"] == 2
+    assert stats["dead"] == 0
+    assert outbox_size == 0
+    assert not queue.dead_letters
+
+
+def test_job_is_dead_lettered_after_max_attempts(api):
+    queue = make_queue(max_attempts=2)
+
+    @queue.handler("broken")
+    async def broken(payload):
+        raise RuntimeError("always fails")
+
+    async def scenario():
+        await queue.start()
+        try:
+            job_id = await queue.enqueue("broken", {})
+            await wait_for(lambda: queue.stats()["dead"] == 1)
+            return job_id, await db.test_outbox.find_one({"id": job_id}, {"_id": 0})
+        finally:
+            await queue.stop()
+
+    job_id, stored = api.portal.call(scenario)
+    assert queue.stats()["retried"] == 1
+    assert [job["id"] for job in queue.dead_letters] == [job_id]
+    assert queue.dead_letters[0]["lastError"] == "always fails"
+    # Dead jobs stay in the outbox for inspection but are never recovered
+    assert stored["status"] == "dead"
+    assert stored["attempts"] == 2
+
+
+def test_unpersisted_jobs_skip_the_outbox(api):
+    queue = make_queue()
+    done = []
+
+    @queue.handler("memory", persist=False)
+    async def memory(payload):
+        done.append(payload)
+
+    async def scenario():
+        await queue.start()
+        try:
+            await queue.enqueue("memory", {"n": 1})
+            assert await db.test_outbox.count_documents({}) == 0
+            await wait_for(lambda: done)
+        finally:
+            await queue.stop()
+
+    api.portal.call(scenario)
+    assert done == [{"n": 1}]
+
+
+def test_start_recovers_jobs_with_a_lapsed_lease(api):
+    queue = make_queue()
+    done = []
+
+    @queue.handler("email")
+    async def email(payload):
+        done.append(payload)
+
+    now = datetime.utcnow()
+    orphan = {"id": "orphan", "type": "email", "payload": {"to": "a"}, "attempts": 0, "status": "pending",
+              "createdAt": now, "lockedUntil": now - timedelta(seconds=1)}
+    leased = dict(orphan, id="leased", payload={"to": "b"}, lockedUntil=now + timedelta(minutes=5))
+
+    async def scenario():
+        await db.test_outbox.insert_many([orphan, leased])
+        await queue.start()
+        try:
+            await wait_for(lambda: done)
+            return [job["id"] async for job in db.test_outbox.find({}, {"_id": 0, "id": 1})]
+        finally:
+            await queue.stop()
+
+    remaining = api.portal.call(scenario)
+    # Another process still holds the lease on the second job
+    assert done == [{"to": "a"}]
+    assert remaining == ["leased"]
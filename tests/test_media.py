@@ -0,0 +1,55 @@
+import pytest
+
+from routes.media import parse_range
+from storage import media_storage
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=990-5000", (990, 999)),
+    (" bytes=5-5 ", (5, 5)),
+])
+def test_satisfiable_ranges(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=0-1,5-6", "items=0-5", "bytes=-", "bytes=a-b", "bytes=20-10", "bytes=2000-1500"])
+def test_unsupported_ranges_serve_whole_file(header):
+    assert parse_range(header, 1000) is None
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=1000-1500", "bytes=-0"])
+def test_unsatisfiable_ranges(header):
+    with pytest.raises(ValueError):
+        parse_range(header, 1000)
+
+
+@pytest.fixture
+def media_file():
+    path = media_storage.local_path("range-test.txt")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(bytes(range(100)))
+    yield "/api/media/range-test.txt"
+    path.unlink(missing_ok=True)
+
+
+def test_range_request_gets_partial_content(api, media_file):
+    response = api.get(media_file, headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == "bytes 10-19/100"
+    assert response.content == bytes(range(10, 20))
+
+
+def test_invalid_range_is_ignored(api, media_file):
+    response = api.get(media_file, headers={"Range": "bytes=20-10"})
+    assert response.status_code == 200
+    assert response.content == bytes(range(100))
+
+
+def test_range_past_the_end_is_unsatisfiable(api, media_file):
+    response = api.get(media_file, headers={"Range": "bytes=100-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */100"
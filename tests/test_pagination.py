@@ -0,0 +1,53 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from pagination import decode_cursor, encode_cursor, keyset_cursor, keyset_filter
+
+
+def raw_token(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    created = datetime(2024, 5, 1, 10, 30, 15, 250000)
+    token = keyset_cursor({"createdAt": created, "id": "abc", "title": "ignored"})
+    assert "=" not in token
+    assert decode_cursor(token) == {"createdAt": created, "id": "abc"}
+
+
+def test_offset_cursor_round_trip():
+    assert decode_cursor(encode_cursor({"offset": 40})) == {"offset": 40}
+
+
+@pytest.mark.parametrize("token", ["not base64!", raw_token([1]), raw_token(5), raw_token({"createdAt": "yesterday"})])
+def test_decode_rejects_invalid_tokens(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+
+def test_keyset_filter_selects_documents_after_cursor():
+    created = datetime(2024, 5, 1)
+    assert keyset_filter({"createdAt": created, "id": "abc"}) == {
+        "$or": [
+            {"createdAt": {"$lt": created}},
+            {"createdAt": created, "id": {"$lt": "abc"}},
+        ]
+    }
+
+
+def test_keyset_filter_without_cursor():
+    assert keyset_filter(None) == {}
+
+
+@pytest.mark.parametrize("cursor", [
+    {"offset": 3},
+    {"createdAt": datetime(2024, 5, 1)},
+    {"createdAt": "2024-05-01", "id": "abc"},
+    {"createdAt": datetime(2024, 5, 1), "id": {"$gt": ""}},
+])
+def test_keyset_filter_rejects_malformed_cursors(cursor):
+    with pytest.raises(ValueError):
+        keyset_filter(cursor)
@@ -0,0 +1,73 @@
+import io
+
+from PIL import Image
+
+from routes import profile
+from storage import media_storage
+
+BOUNDARY = "test-boundary"
+
+
+def png_bytes(width: int = 640, height: int = 480) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 80, 40)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def multipart_body(data: bytes, field: str = "photo") -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="photo.png"\r\n'
+        "Content-Type: image/png\r\n\r\n"
+    ).encode() + data + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def upload(api, body, **headers):
+    headers["content-type"] = f"multipart/form-data; boundary={BOUNDARY}"
+    return api.post("/api/profile/photo", content=body, headers=headers)
+
+
+def staged_files() -> list:
+    return [path for path in media_storage.staging_dir.iterdir()] if media_storage.staging_dir.exists() else []
+
+
+def test_upload_stores_resized_variants(api):
+    response = upload(api, multipart_body(png_bytes()))
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert set(data["variants"]) == {"thumb", "1x", "2x"}
+    assert data["variants"]["thumb"]["width"] == 96
+    assert data["variants"]["1x"]["jpg"] == data["profileImage"]
+    assert api.get("/api/profile/").json()["data"]["profileImage"] == data["profileImage"]
+    assert api.get(data["profileImage"]).status_code == 200
+    assert staged_files() == []
+
+
+def test_declared_oversize_upload_is_rejected_up_front(api, monkeypatch):
+    monkeypatch.setattr(profile, "PROFILE_PHOTO_MAX_BYTES", 1024)
+    body = multipart_body(b"\0" * (64 * 1024))
+    assert upload(api, body).status_code == 413
+
+
+def test_streamed_upload_stops_at_the_limit(api, monkeypatch):
+    monkeypatch.setattr(profile, "PROFILE_PHOTO_MAX_BYTES", 1024)
+    body = multipart_body(b"\0" * 4096)
+
+    # A chunked body has no Content-Length, so the limit is enforced while streaming
+    def chunks():
+        for start in range(0, len(body), 512):
+            yield body[start:start + 512]
+
+    assert upload(api, chunks()).status_code == 413
+    assert staged_files() == []
+
+
+def test_non_image_upload_is_rejected(api):
+    response = upload(api, multipart_body(b"not an image at all"))
+    assert response.status_code == 400
+    assert staged_files() == []
+
+
+def test_upload_needs_the_photo_field(api):
+    assert upload(api, multipart_body(png_bytes(), field="other")).status_code == 400
+    assert api.post("/api/profile/photo", json={"photo": "x"}).status_code == 400
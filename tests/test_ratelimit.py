@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+import ratelimit
+from ratelimit import InMemoryBackend, RateLimitBackend, client_ip
+
+
+def consume(backend, key, rate=1.0, capacity=2.0):
+    return asyncio.run(backend.consume(key, rate, capacity))
+
+
+def test_bucket_allows_burst_then_rejects(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: clock[0])
+    backend = InMemoryBackend()
+    assert consume(backend, "k") == (True, 0.0)
+    assert consume(backend, "k") == (True, 0.0)
+    allowed, retry_after = consume(backend, "k")
+    assert not allowed
+    assert retry_after == pytest.approx(1.0)
+
+
+def test_bucket_refills_over_time(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: clock[0])
+    backend = InMemoryBackend()
+    consume(backend, "k")
+    consume(backend, "k")
+    clock[0] += 0.5
+    allowed, retry_after = consume(backend, "k")
+    assert not allowed and retry_after == pytest.approx(0.5)
+    clock[0] += 0.5
+    assert consume(backend, "k")[0]
+
+
+def test_keys_are_independent_and_evicted_lru():
+    backend = InMemoryBackend(max_keys=2)
+    consume(backend, "a", capacity=1.0)
+    consume(backend, "b", capacity=1.0)
+    assert not consume(backend, "a", capacity=1.0)[0]
+    consume(backend, "c", capacity=1.0)
+    # "b" was least recently used, so it starts again with a full bucket
+    assert list(backend._buckets) == ["a", "c"]
+    assert consume(backend, "b", capacity=1.0)[0]
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        RateLimitBackend()
+
+
+def make_request(forwarded=None, host="10.0.0.1"):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "headers": headers, "client": (host, 1234)})
+
+
+def test_forwarded_for_ignored_by_default(monkeypatch):
+    monkeypatch.setattr(ratelimit, "TRUSTED_PROXY_HOPS", 0)
+    assert client_ip(make_request("1.1.1.1")) == "10.0.0.1"
+
+
+def test_forwarded_for_uses_entries_added_by_trusted_hops(monkeypatch):
+    monkeypatch.setattr(ratelimit, "TRUSTED_PROXY_HOPS", 1)
+    # The left-most entry is whatever the client sent
+    assert client_ip(make_request("6.6.6.6, 203.0.113.7")) == "203.0.113.7"
+    monkeypatch.setattr(ratelimit, "TRUSTED_PROXY_HOPS", 2)
+    assert client_ip(make_request("6.6.6.6, 203.0.113.7, 10.1.1.1")) == "203.0.113.7"
+    assert client_ip(make_request("203.0.113.7")) == "203.0.113.7"
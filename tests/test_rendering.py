@@ -0,0 +1,60 @@
+from rendering import render_markdown, rendered_html_cache
+
+HOSTILE = """# Hello
+
+<script>alert("x")</script>
+
+<img src="/a.png" onerror="alert(1)">
+
+[click](javascript:alert(1)) and [safe](https://example.com)
+
+| Left | Right |
+|:-----|------:|
+| a    | b     |
+
+```python
+print("hi")
+```
+"""
+
+POST = {
+    "title": "Rendering Check",
+    "content": HOSTILE,
+    "category": "Tech",
+    "image": "https://example.com/cover.png",
+}
+
+
+def assert_sanitized(html: str):
+    assert "<script" not in html
+    assert "onerror" not in html
+    assert "javascript:" not in html
+    assert 'href="https://example.com"' in html
+    assert '<img src="/a.png"' in html
+    # What the Markdown extensions emit survives the allowlist
+    assert 'style="text-align:right"' in html
+    assert 'class="language-python"' in html
+
+
+def test_render_markdown_strips_active_content():
+    assert_sanitized(render_markdown(HOSTILE))
+
+
+def test_post_is_served_sanitized(api):
+    slug = api.post("/api/blog/", json=POST).json()["data"]["slug"]
+
+    post = api.get(f"/api/blog/{slug}").json()["data"]
+    assert_sanitized(post["contentHtml"])
+    assert post["content"] == HOSTILE
+
+    # With the cache cold the stored render is served, sanitized on write
+    rendered_html_cache.invalidate()
+    assert_sanitized(api.get(f"/api/blog/{slug}").json()["data"]["contentHtml"])
+
+
+def test_edit_rerenders_the_body(api):
+    created = api.post("/api/blog/", json=dict(POST, content="Plain text")).json()["data"]
+    assert "<p>Plain text</p>" in api.get(f"/api/blog/{created['slug']}").json()["data"]["contentHtml"]
+
+    assert api.put(f"/api/blog/{created['id']}", json={"content": HOSTILE}).status_code == 200
+    assert_sanitized(api.get(f"/api/blog/{created['slug']}").json()["data"]["contentHtml"])
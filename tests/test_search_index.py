@@ -0,0 +1,131 @@
+import asyncio
+from datetime import datetime
+
+from search_index import BlogSearchIndex, tokenize
+
+
+def make_post(post_id, title, content="", published=True, category="Tips", **extra):
+    return {
+        "id": post_id,
+        "slug": f"post-{post_id}",
+        "title": title,
+        "excerpt": "",
+        "content": content,
+        "published": published,
+        "category": category,
+        "createdAt": datetime(2024, 1, int(post_id)),
+        **extra,
+    }
+
+
+def build_index(*posts):
+    index = BlogSearchIndex()
+    for post in posts:
+        index.add(post)
+    return index
+
+
+def test_tokenize_lowercases_words():
+    assert tokenize("Virtual Assistant's 2025 guide!") == ["virtual", "assistant", "s", "2025", "guide"]
+
+
+def test_search_matches_every_term():
+    index = build_index(
+        make_post("1", "Virtual assistant tools"),
+        make_post("2", "Virtual events"),
+    )
+    assert index.search("virtual tools ") == ["1"]
+    assert sorted(index.search("virtual ")) == ["1", "2"]
+
+
+def test_last_term_matches_as_prefix():
+    index = build_index(make_post("1", "Productivity tips"), make_post("2", "Social media"))
+    assert index.search("produc") == ["1"]
+    # Trailing whitespace means the word is complete
+    assert index.search("produc ") == []
+
+
+def test_title_outranks_content():
+    index = build_index(
+        make_post("1", "Notes", content="scheduling"),
+        make_post("2", "Scheduling"),
+    )
+    assert index.search("scheduling ") == ["2", "1"]
+
+
+def test_filters_by_published_and_category():
+    index = build_index(
+        make_post("1", "Email", category="Tips"),
+        make_post("2", "Email", category="Business"),
+        make_post("3", "Email", published=False),
+    )
+    assert sorted(index.search("email", published=True)) == ["1", "2"]
+    assert index.search("email", category="Business") == ["2"]
+
+
+def test_add_replaces_previous_version():
+    index = build_index(make_post("1", "Old title"))
+    index.add(make_post("1", "New title"))
+    assert index.search("old ") == []
+    assert index.search("new ") == ["1"]
+    assert len(index) == 1
+
+
+def test_remove_drops_postings_and_vocabulary():
+    index = build_index(make_post("1", "Unique word"), make_post("2", "Other"))
+    index.remove("1")
+    assert index.search("unique") == []
+    assert "unique" not in index._terms
+    assert len(index) == 1
+    assert not index.has_published_slug("post-1")
+
+
+def test_published_slugs():
+    index = build_index(make_post("1", "Live"), make_post("2", "Draft", published=False))
+    assert index.has_published_slug("post-1")
+    assert not index.has_published_slug("post-2")
+
+
+class FakeCollection:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def find(self, query, projection=None):
+        ids = query.get("id", {}).get("$in")
+        documents = [doc for doc in self.documents if ids is None or doc["id"] in ids]
+
+        async def cursor():
+            for doc in documents:
+                yield dict(doc)
+        return cursor()
+
+
+def test_refresh_picks_up_external_writes():
+    stamp = datetime(2024, 2, 1, 12, 0, 0, 123456)
+    index = build_index(
+        make_post("1", "Kept", updatedAt=stamp),
+        make_post("2", "Deleted", updatedAt=stamp),
+        make_post("3", "Before edit", updatedAt=stamp),
+    )
+    collection = FakeCollection([
+        # Mongo stores milliseconds; an unchanged post must not count as changed
+        make_post("1", "Kept", updatedAt=stamp.replace(microsecond=123000)),
+        make_post("3", "After edit", updatedAt=datetime(2024, 2, 2)),
+        make_post("4", "Created elsewhere", updatedAt=datetime(2024, 2, 2)),
+    ])
+
+    assert asyncio.run(index.refresh(collection)) == 3
+    assert index.search("deleted ") == []
+    assert index.search("after ") == ["3"]
+    assert index.search("elsewhere ") == ["4"]
+    assert asyncio.run(index.refresh(collection)) == 0
+
+
+def test_prefix_matches_every_expansion():
+    # More terms share the prefix than any fan-out cap would keep, and the
+    # real match sorts after all of them
+    filler = " ".join(f"pro{index:03d}" for index in range(100))
+    index = build_index(make_post("1", "Filler", content=filler), make_post("2", "Productivity"))
+    assert sorted(index.search("pro")) == ["1", "2"]
+    assert index.search("filler pro") == ["1"]
+    assert index.search("productiv") == ["2"]
@@ -0,0 +1,50 @@
+from trending import DecayingTopK
+
+
+def test_ranks_by_hits():
+    tracker = DecayingTopK(half_life=3600)
+    now = tracker._landmark
+    for key, hits in (("a", 1), ("b", 3), ("c", 2)):
+        tracker.hit(key, hits, at=now)
+    assert [key for key, _ in tracker.top(3, now=now)] == ["b", "c", "a"]
+    assert [key for key, _ in tracker.top(1, now=now)] == ["b"]
+    assert tracker.top(0, now=now) == []
+
+
+def test_scores_halve_every_half_life():
+    tracker = DecayingTopK(half_life=3600)
+    now = tracker._landmark
+    tracker.hit("a", 8, at=now)
+    (_, score), = tracker.top(1, now=now + 3600)
+    assert abs(score - 4) < 1e-9
+
+
+def test_recent_hits_outrank_older_ones():
+    tracker = DecayingTopK(half_life=3600)
+    now = tracker._landmark
+    tracker.hit("old", 3, at=now)
+    tracker.hit("new", 2, at=now + 2 * 3600)
+    assert [key for key, _ in tracker.top(2, now=now + 2 * 3600)] == ["new", "old"]
+
+
+def test_evicts_coldest_key_past_capacity():
+    tracker = DecayingTopK(half_life=3600, capacity=2)
+    now = tracker._landmark
+    tracker.hit("a", 5, at=now)
+    tracker.hit("b", 1, at=now)
+    tracker.hit("c", 3, at=now)
+    assert len(tracker) == 2
+    assert [key for key, _ in tracker.top(5, now=now)] == ["a", "c"]
+
+
+def test_rescale_keeps_order_and_scores():
+    tracker = DecayingTopK(half_life=60)
+    start = tracker._landmark
+    tracker.hit("a", 2, at=start)
+    # Far enough ahead that the forward-decay exponent forces a rescale
+    later = start + 60 * 100
+    tracker.hit("b", 1, at=later)
+    assert tracker._landmark == later
+    ranked = tracker.top(2, now=later)
+    assert [key for key, _ in ranked] == ["b", "a"]
+    assert abs(ranked[0][1] - 1) < 1e-9